@@ -17,6 +17,7 @@ class Config:
     # Bot Settings
     DISCORD_COMMAND_PREFIX: str = os.getenv("DISCORD_COMMAND_PREFIX", "!")
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    LOOP_POLICY: str = os.getenv("LOOP_POLICY", "auto")  # "auto", "uvloop" or "asyncio"
     
     @classmethod
     def validate(cls) -> bool:
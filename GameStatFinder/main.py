@@ -16,6 +16,7 @@ from aiogram import Bot
 
 from config import config
 from bot_handlers import DiscordBotHandlers, TelegramBotHandlers
+from utils import get_loop_factory
 
 # Configure logging
 logging.basicConfig(
@@ -170,7 +171,7 @@ class DualPlatformBot:
             try:
                 loop = asyncio.get_running_loop()
             except RuntimeError:
-                loop = asyncio.new_event_loop()
+                loop = get_loop_factory(config.LOOP_POLICY)()
                 asyncio.set_event_loop(loop)
             
             # Schedule cleanup
@@ -226,8 +227,9 @@ if __name__ == "__main__":
             print("❌ Требуется Python 3.8 или новее")
             sys.exit(1)
         
-        # Run the application
-        asyncio.run(main())
+        # Run the application on the configured loop (uvloop when available)
+        with asyncio.Runner(loop_factory=get_loop_factory(config.LOOP_POLICY)) as runner:
+            runner.run(main())
         
     except KeyboardInterrupt:
         print("\n🛑 Боты остановлены")
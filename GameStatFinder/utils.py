@@ -1,5 +1,9 @@
+import asyncio
+import logging
 import re
-from typing import Tuple, Optional
+from typing import Callable, Tuple, Optional
+
+logger = logging.getLogger(__name__)
 
 def validate_nickname(nickname: str) -> Tuple[bool, Optional[str]]:
     """
@@ -84,3 +88,29 @@ def escape_markdown(text: str) -> str:
         text = text.replace(char, f'\\{char}')
     
     return text
+
+def get_loop_factory(policy: str = "auto") -> Callable[[], asyncio.AbstractEventLoop]:
+    """
+    Event loop constructor for the LOOP_POLICY setting
+    
+    Args:
+        policy: "auto" (uvloop if installed), "uvloop" or "asyncio"
+        
+    Returns:
+        uvloop.new_event_loop or the standard loop constructor
+    """
+    # aiogram ставит глобальную политику uvloop, если он установлен,
+    # поэтому стандартный цикл создаётся напрямую из политики по умолчанию
+    asyncio_loop = asyncio.DefaultEventLoopPolicy().new_event_loop
+    policy = policy.lower()
+    if policy == "asyncio":
+        return asyncio_loop
+    
+    try:
+        import uvloop
+    except ImportError:
+        if policy == "uvloop":
+            logger.warning("LOOP_POLICY=uvloop, but uvloop is not installed: using the asyncio loop")
+        return asyncio_loop
+    
+    return uvloop.new_event_loop
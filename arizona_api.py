@@ -4,6 +4,10 @@ API client for fetching player statistics and server status from Arizona RP (Dep
 
 import asyncio
 import aiohttp
+import functools
+import html
+import time
+from collections import OrderedDict
 from typing import Dict, Any, Tuple, Optional
 import logging
 import re
@@ -13,6 +17,12 @@ from unified_config import API_URL, API_KEY, REQUEST_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+PLAYER_CACHE_TTL = 60        # секунд: /stats и inline-запросы одного игрока не ходят в API повторно
+PLAYER_CACHE_SIZE = 1000
+
+PlayerKey = Tuple[str, int]  # (ник в нижнем регистре, ID сервера)
+PlayerResult = Tuple[Optional[Dict[str, Any]], Optional[str]]
+
 
 class ArizonaRPAPIClient:
     """Client for fetching Arizona RP player information and server status"""
@@ -26,6 +36,12 @@ class ArizonaRPAPIClient:
         self._servers_cache: Dict[int, Dict[str, Any]] = {}
         self._cache_timestamp: Optional[datetime] = None
         self._cache_duration = 300  # 5 минут
+        # Статистика игроков: успешные ответы на PLAYER_CACHE_TTL и идущие запросы
+        self._player_cache: "OrderedDict[PlayerKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._player_requests: Dict[PlayerKey, asyncio.Task] = {}
+
+        # Идущий запрос статуса: одновременные промахи кэша ждут его, а не запускают свои
+        self._servers_task: Optional[asyncio.Task] = None
 
     # =============== Проверки ===============
     def validate_nickname(self, nickname: str) -> Tuple[bool, Optional[str]]:
@@ -48,10 +64,45 @@ class ArizonaRPAPIClient:
         return True, None
 
     # =============== API игрока ===============
-    async def fetch_player_stats(
-        self, nickname: str, server_id: int
-    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-        """Получение статистики игрока"""
+    async def fetch_player_stats(self, nickname: str, server_id: int) -> PlayerResult:
+        """Получение статистики игрока: из кэша, из уже идущего запроса или из API"""
+        key = (nickname.lower(), server_id)
+        cached = self._player_cache.get(key)
+        if cached is not None:
+            expires, data = cached
+            if expires > time.monotonic():
+                self._player_cache.move_to_end(key)
+                return data, None
+            del self._player_cache[key]
+
+        task = self._player_requests.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._player_requests[key] = asyncio.create_task(self._request_player_stats(nickname, server_id))
+            task.add_done_callback(functools.partial(self._player_request_done, key))
+        # shield: отменённый inline-запрос не обрывает общий запрос к API
+        return await asyncio.shield(task)
+
+    def is_player_cached(self, nickname: str, server_id: int) -> bool:
+        """Вернёт ли fetch_player_stats ответ без нового обращения к API (кэш или идущий запрос)"""
+        key = (nickname.lower(), server_id)
+        cached = self._player_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return True
+        task = self._player_requests.get(key)
+        return task is not None and not task.done()
+
+    def _player_request_done(self, key: PlayerKey, task: asyncio.Task):
+        if self._player_requests.get(key) is task:
+            del self._player_requests[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        data, _ = task.result()
+        if data is not None:  # ошибки не кэшируем
+            self._player_cache[key] = (time.monotonic() + PLAYER_CACHE_TTL, data)
+            if len(self._player_cache) > PLAYER_CACHE_SIZE:
+                self._player_cache.popitem(last=False)
+
+    async def _request_player_stats(self, nickname: str, server_id: int) -> PlayerResult:
         if not self.api_key:
             return None, "❌ API ключ не настроен. Обратитесь к администратору."
 
@@ -62,7 +113,10 @@ class ArizonaRPAPIClient:
             timeout = aiohttp.ClientTimeout(total=self.timeout)
             async with aiohttp.ClientSession(timeout=timeout) as session:
                 async with session.get(self.api_url, headers=headers, params=params) as response:
-                    logger.info(f"API request for {nickname} on server {server_id}: {response.status}")
+                    if response.status == 200:
+                        logger.debug(f"API request for {nickname} on server {server_id}: 200")
+                    else:
+                        logger.warning(f"API request for {nickname} on server {server_id}: {response.status}")
 
                     if response.status == 401:
                         return None, "❌ Ошибка авторизации API. Проверьте API ключ."
@@ -105,6 +159,107 @@ class ArizonaRPAPIClient:
             return True
         return False
 
+    # =============== Форматирование ===============
+    @staticmethod
+    def create_progress_bar(value, max_value: int = 100, length: int = 10) -> str:
+        """Полоска для здоровья, голода и т.п."""
+        try:
+            value = int(value or 0)
+            filled = max(0, min(length, int((value / max_value) * length)))
+            return f"[{'█' * filled}{'░' * (length - filled)}] {value}%"
+        except (ValueError, TypeError, ZeroDivisionError):
+            return f"[{'░' * length}] 0%"
+
+    @staticmethod
+    def format_money(amount) -> str:
+        """Деньги с разделителями тысяч"""
+        if amount is None:
+            return "$0"
+        try:
+            return f"${int(amount):,}"
+        except (ValueError, TypeError):
+            return f"${html.escape(str(amount))}"
+
+    def format_stats(self, data: Dict[str, Any], nickname: str, server_id: int) -> str:
+        """Статистика игрока в HTML для Telegram (перенесено из GameStatFinder/api_client.py)"""
+        e = lambda value: html.escape(str(value))  # noqa: E731 — строки из API идут в HTML
+        try:
+            if not data or "error" in data or "id" not in data:
+                return f"❌ Игрок '{e(nickname)}' не найден на сервере {server_id}."
+
+            server_info = data.get("server") or {}
+            server_name = server_info.get("name", self.get_server_name(server_id))
+
+            msg = f"👤 <b>Информация об игроке {e(nickname)}</b>\n\n"
+            msg += f"🌐 <b>Сервер:</b> {e(server_name)} (ID: {e(server_info.get('id', server_id))})\n\n"
+            msg += f"🆔 <b>ID игрока:</b> {e(data['id'])}\n"
+            msg += f"📱 <b>Телефон:</b> {e(data.get('phone_number', 'Неизвестно'))}\n"
+            msg += f"⏱ <b>Отыграно часов:</b> {e(data.get('hours_played', 0))}\n\n"
+
+            level_info = data.get("level", {})
+            if isinstance(level_info, dict):
+                msg += f"🌟 <b>Уровень:</b> {e(level_info.get('level', 0))}\n"
+                msg += f"📊 <b>Опыт:</b> {e(level_info.get('current_exp', 0))}/{e(level_info.get('next_exp', 100))}\n\n"
+            elif isinstance(level_info, (int, str)):
+                msg += f"🌟 <b>Уровень:</b> {e(level_info)}\n\n"
+
+            msg += f"❤️ <b>Здоровье:</b> {self.create_progress_bar(data.get('health', 0))}\n"
+            msg += f"🍗 <b>Голод:</b> {self.create_progress_bar(data.get('hunger', 0))}\n"
+            msg += f"💉 <b>Наркозависимость:</b> {e(data.get('drug_addiction', 0))}%\n\n"
+
+            vip_info = data.get("vip_info") or {}
+            if vip_info:
+                msg += f"👑 <b>VIP:</b> {e(vip_info.get('level', 'None'))}\n"
+                add_vip = vip_info.get("add_vip", "Нет")
+                if add_vip != "Нет":
+                    msg += f"➕ <b>Доп. VIP:</b> {e(add_vip)}\n"
+                msg += "\n"
+
+            money = data.get("money") or {}
+            if money:
+                msg += "💰 <b>Финансы:</b>\n"
+                msg += f"├─ 💵 <b>Всего:</b> {self.format_money(money.get('total', 0))}\n"
+                msg += f"├─ 💴 <b>Наличные:</b> {self.format_money(money.get('hand', 0))}\n"
+                msg += f"├─ 🏦 <b>Банк:</b> {self.format_money(money.get('bank', 0))}\n"
+                msg += f"├─ 💼 <b>Депозит:</b> {self.format_money(money.get('deposit', 0))}\n"
+                msg += f"├─ 💎 <b>Донат валюта:</b> {e(money.get('donate_currency', 0))}\n"
+                msg += f"├─ 📱 <b>Баланс телефона:</b> {self.format_money(money.get('phone_balance', 0))}\n"
+                msg += f"└─ ❤️ <b>Благотворительность:</b> {self.format_money(money.get('charity', 0))}\n\n"
+
+            msg += f"💼 <b>Работа:</b> {e(data.get('job', 'Безработный'))}\n"
+            org_info = data.get("organization") or {}
+            if org_info:
+                msg += f"🏢 <b>Организация:</b> {e(org_info.get('name', 'Нет'))}\n"
+                msg += f"├─ 🏅 <b>Должность:</b> {e(org_info.get('rank', 'Нет'))}\n"
+                msg += f"└─ {'👔 В форме' if org_info.get('uniform') else '👕 Не в форме'}\n\n"
+            else:
+                msg += "🏢 <b>Организация:</b> Нет\n\n"
+
+            msg += f"⚖️ <b>Законопослушность:</b> {self.create_progress_bar(data.get('law_abiding', 0))}\n"
+            msg += f"🚨 <b>Уровень розыска:</b> {e(data.get('wanted_level', 0))}\n"
+            msg += f"⚠️ <b>Предупреждения:</b> {e(data.get('warnings', 0))}\n\n"
+
+            family = data.get("family") or {}
+            if family:
+                member_info = family.get("member_info") or {}
+                msg += f"👥 <b>Семья:</b> {e(family.get('name', 'Неизвестно'))}\n"
+                msg += f"├─ 👑 <b>Лидер:</b> {e(family.get('leader', 'Неизвестно'))}\n"
+                msg += f"├─ 🏆 <b>Я лидер:</b> {'Да' if member_info.get('is_leader') else 'Нет'}\n"
+                msg += f"└─ 🎖️ <b>Ранг в семье:</b> {e(member_info.get('rank', 0))}\n\n"
+
+            status = data.get("status") or {}
+            if status:
+                online = status.get("online", False)
+                msg += f"<b>Статус:</b> {'🟢 В сети' if online else '🔴 Не в сети'}\n"
+                if online:
+                    msg += f"🎮 <b>ID в игре:</b> {e(status.get('player_id', 'Неизвестно'))}\n"
+
+            return msg
+
+        except Exception as ex:
+            logger.error(f"Error formatting Arizona RP stats: {ex}")
+            return f"❌ Ошибка при форматировании информации для игрока {e(nickname)}."
+
     # =============== Серверы ===============
     def get_server_name(self, server_id: int) -> str:
         """Названия серверов"""
@@ -129,6 +284,13 @@ class ArizonaRPAPIClient:
         if self._is_cache_valid() and self._servers_cache:
             return self._servers_cache.copy()
 
+        task = self._servers_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._servers_task = asyncio.create_task(self._fetch_all_servers_status())
+        # shield: отмена одного ожидающего не обрывает запрос для остальных
+        return (await asyncio.shield(task)).copy()
+
+    async def _fetch_all_servers_status(self) -> Dict[int, Dict[str, Any]]:
         servers_info: Dict[int, Dict[str, Any]] = {}
         server_ids = list(range(1, 33)) + [200] + list(range(101, 104))
 
@@ -0,0 +1,29 @@
+"""Shared pieces of the offline benchmarks: no network, no Telegram."""
+
+import datetime
+
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Chat, Message
+
+
+class OfflineSession(BaseSession):
+    """Answers every Bot API call locally: True, or a minimal sent Message."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls += 1
+        if type(method).__name__ == "SendMessage":
+            return Message(
+                message_id=self.calls, date=datetime.datetime.now(),
+                chat=Chat(id=method.chat_id, type="supergroup"), text=method.text,
+            )
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
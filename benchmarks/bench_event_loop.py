@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the standard asyncio loop against uvloop (LOOP_POLICY), offline.
+
+Workloads, each run on every available loop:
+  updates   - Telegram updates fed through an aiogram Dispatcher with command
+              and text handlers; Bot API calls are answered by a local session,
+              so only aiogram and the loop are measured. Reported as updates/s.
+  sweep     - samp_query.query_all_servers (threads + blocking sockets, as in
+              production) against local SA-MP responders, one per Arizona server.
+  datagram  - the same sweep over loop.create_datagram_endpoint, i.e. UDP
+              handled by the loop itself - where uvloop differs the most.
+Sweeps are reported as p50/p99 latency of a whole sweep in milliseconds.
+
+    python benchmarks/bench_event_loop.py [--updates 20000] [--sweeps 200]
+"""
+
+import argparse
+import asyncio
+import datetime
+import importlib.util
+import os
+import statistics
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot, Dispatcher, F  # noqa: E402
+from aiogram.filters import Command  # noqa: E402
+from aiogram.types import Chat, Message, Update, User  # noqa: E402
+
+import event_loop  # noqa: E402
+import samp_query  # noqa: E402
+from _offline import OfflineSession  # noqa: E402
+
+CHAT_ID = -100
+CONCURRENCY = 64          # апдейтов в обработке одновременно, как handle_as_tasks при polling
+TEXTS = ("/rules", "/id", "привет всем", "/help", "кто на сервере?", "/info")
+
+
+class Responder(asyncio.DatagramProtocol):
+    """Local SA-MP server: answers every 'i' query with a fixed server info packet."""
+
+    def __init__(self, players: int):
+        self.players = players
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        body = struct.pack("<BHH", 0, self.players, 1000)
+        for value in (b"Arizona Role Play | Benchmark", b"Arizona v1", b"Russian"):
+            body += struct.pack("<I", len(value)) + value
+        self.transport.sendto(data[:11] + body, addr)
+
+
+class SweepClient(asyncio.DatagramProtocol):
+    """One loop-native query: resolves with the parsed response."""
+
+    def __init__(self, client: samp_query.SAMPQueryClient, future: asyncio.Future):
+        self.client = client
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done():
+            self.future.set_result(self.client._parse_server_info_response(data))
+
+
+def make_dispatcher() -> Dispatcher:
+    dp = Dispatcher()
+
+    @dp.message(Command("rules", "info", "help"))
+    async def static_text(message: Message):
+        await message.answer(f"<b>{message.text}</b>\n" + "Правило. " * 40)
+
+    @dp.message(Command("id"))
+    async def user_id(message: Message):
+        await message.reply(f"Ваш ID: <code>{message.from_user.id}</code>")
+
+    @dp.message(F.text)
+    async def text(message: Message):
+        return None  # обычные сообщения: только фильтры, без ответа
+
+    return dp
+
+
+def make_updates(count: int) -> list:
+    now = datetime.datetime.now()
+    return [
+        Update(update_id=i, message=Message(
+            message_id=i, date=now, chat=Chat(id=CHAT_ID, type="supergroup"),
+            from_user=User(id=1000 + i % 500, is_bot=False, first_name="User"),
+            text=TEXTS[i % len(TEXTS)],
+        ))
+        for i in range(count)
+    ]
+
+
+async def bench_updates(count: int) -> float:
+    bot = Bot("42:BENCHMARK", session=OfflineSession())
+    dp = make_dispatcher()
+    updates = make_updates(count)
+    for update in updates[:200]:  # прогрев: фильтры, кэши pydantic
+        await dp.feed_update(bot, update)
+
+    started = time.perf_counter()
+    for i in range(0, count, CONCURRENCY):
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in updates[i:i + CONCURRENCY]))
+    return count / (time.perf_counter() - started)
+
+
+async def start_responders() -> tuple:
+    loop = asyncio.get_running_loop()
+    transports, servers = [], []
+    for server in samp_query.ARIZONA_SERVERS:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda players=server["id"]: Responder(players), local_addr=("127.0.0.1", 0)
+        )
+        transports.append(transport)
+        servers.append(dict(server, ip="127.0.0.1", port=transport.get_extra_info("sockname")[1]))
+    return transports, servers
+
+
+async def query_datagram(client: samp_query.SAMPQueryClient, ip: str, port: int) -> samp_query.ServerInfo:
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: SweepClient(client, future), remote_addr=(ip, port)
+    )
+    try:
+        transport.sendto(client._create_query_packet(ip, port, client.OPCODE_SERVER_INFO))
+        return await asyncio.wait_for(future, client.timeout)
+    finally:
+        transport.close()
+
+
+async def bench_sweeps(count: int) -> dict:
+    transports, servers = await start_responders()
+    production_servers = samp_query.ARIZONA_SERVERS
+    samp_query.ARIZONA_SERVERS = servers
+    client = samp_query.SAMPQueryClient(timeout=1.5)
+    timings = {"sweep": [], "datagram": []}
+    try:
+        for i in range(count + 5):  # первые 5 — прогрев пула потоков
+            started = time.perf_counter()
+            results = await samp_query.query_all_servers()
+            sweep = time.perf_counter() - started
+            assert all(info.is_online for info in results.values()), "local responder did not answer"
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(query_datagram(client, s["ip"], s["port"]) for s in servers))
+            datagram = time.perf_counter() - started
+            assert all(info.is_online for info in results)
+
+            if i >= 5:
+                timings["sweep"].append(sweep * 1000)
+                timings["datagram"].append(datagram * 1000)
+    finally:
+        samp_query.ARIZONA_SERVERS = production_servers
+        for transport in transports:
+            transport.close()
+    return timings
+
+
+def percentile(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] if len(values) > 1 else values[0]
+
+
+async def run_loop(updates: int, sweeps: int) -> dict:
+    result = {"loop": event_loop.loop_name(), "updates_s": await bench_updates(updates)}
+    result.update(await bench_sweeps(sweeps))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--sweeps", type=int, default=200)
+    args = parser.parse_args()
+
+    results = []
+    for policy in ("asyncio", "uvloop"):
+        if policy == "uvloop" and importlib.util.find_spec("uvloop") is None:
+            print(f"{policy}: not installed, skipped (pip install uvloop)\n")
+            continue
+        results.append(event_loop.run(run_loop(args.updates, args.sweeps), policy))
+
+    print(f"{len(samp_query.ARIZONA_SERVERS)} servers per sweep, {args.sweeps} sweeps, {args.updates} updates\n")
+    print(f"{'loop':>8} | {'updates/s':>10} | {'sweep p50':>9} | {'sweep p99':>9} | "
+          f"{'dgram p50':>9} | {'dgram p99':>9}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['loop']:>8} | {r['updates_s']:>10.0f} | {percentile(r['sweep'], 50):>7.2f}ms | "
+              f"{percentile(r['sweep'], 99):>7.2f}ms | {percentile(r['datagram'], 50):>7.2f}ms | "
+              f"{percentile(r['datagram'], 99):>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the whole moderation path (ModerationMiddleware) on a synthetic chat
+corpus, offline. Telegram is replaced by a session that answers locally, so
+deletes/warnings cost what aiogram costs, without the network.
+
+Variants:
+  loop      - the old check: `word in message.text.lower()` for every word
+  compiled  - BannedWordMatcher (normalization + Aho-Corasick / alternations)
+  +spam     - compiled plus the shared near-duplicate index
+
+Reported per variant and word-list size: time to build the matchers of every
+chat in the corpus (done before the timed run), messages per second, p50/p99
+latency of one middleware call and peak memory allocated while building and
+running (tracemalloc, measured in a separate pass so it doesn't skew timings).
+
+    python benchmarks/bench_moderation.py [--messages 3000]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot  # noqa: E402
+from aiogram.types import Chat, Message, User  # noqa: E402
+
+from data_manager import DataManager  # noqa: E402
+from deletion_scheduler import DeletionScheduler  # noqa: E402
+from duplicates import DuplicateIndex  # noqa: E402
+from filters import PermissionSet  # noqa: E402
+from moderation import ModerationMiddleware  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+from word_matcher import BannedWordMatcher, WordMatch  # noqa: E402
+from _offline import OfflineSession  # noqa: E402
+
+CYRILLIC = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+LATIN = "abcdefghijklmnopqrstuvwxyz"
+CONSONANTS = "бвгджзклмнпрстфхцчшщ"
+VOWELS = "аеиоуыэюя"
+EMOJI = "😀😂🔥👍🎉❤️🚗💰🤝🙏"
+EVASIONS = {"а": "a", "о": "0", "е": "e", "з": "3", "с": "c", "р": "p"}
+WORD_COUNTS = (10, 100, 1000, 10000)
+CHAT_ID = -100
+CHATS = 5
+
+
+class LoopMatcher:
+    """Pre-compilation behaviour: lowercase the text and try every word."""
+
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+
+    def search(self, text: str, chat_id=None):
+        lowered = text.lower()
+        for word in self.data_manager.get_banned_words(chat_id):
+            if word in lowered:
+                start = lowered.find(word)
+                return WordMatch(word, text[start:start + len(word)], start, start + len(word))
+        return None
+
+
+def random_word(rng: random.Random, alphabet: str = CYRILLIC, lo: int = 2, hi: int = 10) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(lo, hi)))
+
+
+def banned_word(rng: random.Random) -> str:
+    """Pronounceable word from consonant-vowel syllables, like real banned words
+    (random letter soup collapses to 2-3 letter patterns after normalization)."""
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+
+
+def evade(rng: random.Random, word: str) -> str:
+    """Homoglyphs, inserted dots and a doubled letter - what the normalizer is for."""
+    chars = [EVASIONS.get(ch, ch) if rng.random() < 0.5 else ch for ch in word]
+    if len(chars) > 2 and rng.random() < 0.5:
+        chars.insert(rng.randrange(1, len(chars)), ".")
+    if rng.random() < 0.5:
+        i = rng.randrange(len(chars))
+        chars.insert(i, chars[i])
+    return "".join(chars)
+
+
+def make_text(rng: random.Random, words: list, i: int) -> str:
+    kind = rng.random()
+    if kind < 0.05:
+        length = rng.randint(150, 600)   # длинные сообщения
+    else:
+        length = rng.randint(2, 25)
+    parts = []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.7:
+            parts.append(random_word(rng))
+        elif r < 0.9:
+            parts.append(random_word(rng, LATIN))
+        else:
+            parts.append(rng.choice(EMOJI))
+    if i % 20 == 0 and words:  # ~5% нарушений, половина из них с обходом фильтра
+        word = rng.choice(words)
+        parts.insert(rng.randrange(len(parts) + 1), evade(rng, word) if i % 40 == 0 else word)
+    text = " ".join(parts)
+    return text.capitalize() if rng.random() < 0.3 else text
+
+
+def make_corpus(rng: random.Random, words: list, count: int, bot: Bot) -> list:
+    now = datetime.datetime.now()
+    messages = []
+    for i in range(count):
+        chat_id = CHAT_ID - i % CHATS
+        messages.append(Message(
+            message_id=i + 1, date=now, text=make_text(rng, words, i),
+            chat=Chat(id=chat_id, type="supergroup", title=f"chat {chat_id}"),
+            from_user=User(id=1000 + i % 300, is_bot=False, first_name="user"),
+        ).as_(bot))
+    return messages
+
+
+def make_middleware(variant: str, data_manager: DataManager, permissions: PermissionSet):
+    scheduler = DeletionScheduler(path=None)  # не запускается: только очередь
+    if variant == "loop":
+        return ModerationMiddleware(LoopMatcher(data_manager), permissions, scheduler)
+    duplicates = DuplicateIndex() if variant == "+spam" else None
+    return ModerationMiddleware(BannedWordMatcher(data_manager), permissions, scheduler, duplicates=duplicates)
+
+
+async def handler(event, data):
+    return None
+
+
+async def run_variant(variant: str, data_manager: DataManager, permissions: PermissionSet, messages: list):
+    middleware = make_middleware(variant, data_manager, permissions)
+    # Сборка словарей всех чатов корпуса не входит в замер: у неё своя колонка
+    started = time.perf_counter()
+    for chat_id in sorted({message.chat.id for message in messages}):
+        middleware.matcher.search("", chat_id)
+    build_ms = (time.perf_counter() - started) * 1000
+    latencies = []
+    started = time.perf_counter()
+    for message in messages:
+        t0 = time.perf_counter_ns()
+        await middleware(handler, message, {})
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "build_ms": build_ms,
+        "msg_s": len(messages) / elapsed,
+        "p50": latencies[len(latencies) // 2] / 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] / 1000,
+        "violations": middleware.stats.violations,
+    }
+
+
+async def measure_memory(variant: str, data_manager: DataManager, permissions: PermissionSet, messages: list) -> float:
+    tracemalloc.start()
+    middleware = make_middleware(variant, data_manager, permissions)
+    for message in messages:
+        await middleware(handler, message, {})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+async def main(message_count: int):
+    rng = random.Random(42)
+    bot = Bot(token="42:BENCHMARK", session=OfflineSession())
+
+    print(f"{'words':>6} | {'variant':>8} | {'build ms':>8} | {'msg/s':>9} | {'p50 µs':>8} | "
+          f"{'p99 µs':>8} | {'peak KB':>8} | violations")
+    print("-" * 89)
+    for count in WORD_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)  # data/*.json репозитория не импортируются в базу
+            data_manager = DataManager(SqliteStorage(":memory:"))
+            words = sorted({banned_word(rng) for _ in range(count)})
+            for word in words:
+                data_manager.add_banned_word(word)
+            permissions = PermissionSet(data_manager, creator_id=0)
+            messages = make_corpus(rng, words, message_count, bot)
+
+            for variant in ("loop", "compiled", "+spam"):
+                result = await run_variant(variant, data_manager, permissions, messages)
+                peak_kb = await measure_memory(variant, data_manager, permissions, messages)
+                print(f"{count:>6} | {variant:>8} | {result['build_ms']:>8.1f} | {result['msg_s']:>9.0f} | "
+                      f"{result['p50']:>8.1f} | {result['p99']:>8.1f} | {peak_kb:>8.0f} | {result['violations']}")
+            data_manager.storage.close()
+            os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        print("-" * 89)
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=3000, help="messages per word-list size")
+    asyncio.run(main(parser.parse_args().messages))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: banned-word loop (`word in text` per word) vs the Aho-Corasick matcher.
+"automaton" forces the automaton; "matcher" is what production uses (it falls
+back to a linear scan for lists up to LINEAR_SCAN_LIMIT words).
+
+    python benchmarks/bench_word_matcher.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_matcher import AhoCorasick, LINEAR_SCAN_LIMIT  # noqa: E402
+
+ALPHABET = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+MESSAGES = 2000
+
+
+def random_word(rng: random.Random, lo: int = 4, hi: int = 10) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(lo, hi)))
+
+
+def make_messages(rng: random.Random, words: list) -> list:
+    messages = []
+    for i in range(MESSAGES):
+        text = " ".join(random_word(rng, 2, 9) for _ in range(rng.randint(3, 40)))
+        if i % 20 == 0 and words:  # ~5% сообщений с нарушением
+            text += " " + rng.choice(words)
+        messages.append(text)
+    return messages
+
+
+def naive(words: list, text: str):
+    for word in words:
+        if word in text:
+            return word
+    return None
+
+
+def run(fn, messages: list) -> float:
+    start = time.perf_counter()
+    for text in messages:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(messages) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'words':>7} | {'loop µs/msg':>12} | {'automaton µs/msg':>17} | "
+          f"{'matcher µs/msg':>15} | {'build ms':>9} | speedup")
+    print("-" * 86)
+    for count in (10, 100, 1000, 10000):
+        words = list({random_word(rng) for _ in range(count)})
+        messages = make_messages(rng, words)
+
+        start = time.perf_counter()
+        matcher = AhoCorasick(words)
+        automaton = AhoCorasick(words, linear_scan_limit=0)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for text in messages[:200]:
+            assert (naive(words, text) is None) == (automaton.search(text) is None)
+
+        loop_us = run(lambda t: naive(words, t), messages)
+        ac_us = run(automaton.search, messages)
+        matcher_us = run(matcher.search, messages)
+        print(f"{count:>7} | {loop_us:>12.1f} | {ac_us:>17.1f} | {matcher_us:>15.1f} | "
+              f"{build_ms:>9.1f} | {loop_us / matcher_us:>6.1f}x")
+    print(f"\nLINEAR_SCAN_LIMIT = {LINEAR_SCAN_LIMIT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,13 +18,12 @@ if "audioop" not in sys.modules:
 import asyncio
 import signal
 import logging
+from unified_config import setup_logging
 from unified_bot import UnifiedBot
+import event_loop
 
 # Логирование
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 async def run_bot():
@@ -49,7 +48,7 @@ if __name__ == "__main__":
     print("=" * 60)
 
     try:
-        asyncio.run(run_bot())
+        event_loop.run(run_bot())
     except KeyboardInterrupt:
         print("\n🛑 Бот остановлен пользователем")
     except SystemExit as e:
@@ -27,7 +27,10 @@ from config import (
 )
 from data_manager import DataManager
 # Клавиатуры удалены, команды настроены через BotFather
-from filters import IsAdmin, IsCreator
+from filters import IsAdmin, IsCreator, PermissionSet
+from word_matcher import BannedWordMatcher
+from deletion_scheduler import DeletionScheduler
+from moderation import WARNING_TTL
 from typing import List
 
 # Configure logging
@@ -77,6 +80,12 @@ try:
     bot = None
     dp = Dispatcher()
     data_manager = DataManager()
+    # Фильтры IsAdmin/IsCreator берут права отсюда: тот же DataManager, что меняет /addadmin и /unadmin
+    dp["permissions"] = PermissionSet(data_manager)
+    # Автомат пересобирается только при изменении списка слов
+    banned_words_matcher = BannedWordMatcher(data_manager)
+    # Предупреждения удаляются планировщиком, а не спящим обработчиком
+    deletion_scheduler = DeletionScheduler()
     logger.info("Dispatcher and DataManager initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize core components: {e}")
@@ -467,40 +476,36 @@ async def handle_message(message: types.Message):
             return
 
     # Continue with banned words check
-    banned_words = data_manager.get_banned_words()
     message_text = message.text.lower() if message.text else ""
 
     if not message_text:
         return
 
-    for word in banned_words:
-        if word in message_text:
-            try:
-                await message.delete()
-                warning_msg = (
-                    f"Сообщение от {message.from_user.get_mention(as_html=True)} удалено "
-                    f"из-за использования запрещенного слова."
-                )
-                sent_msg = await message.answer(warning_msg)
-
-                # Notify creator about moderation action
-                await notify_creator(
-                    f"🚫 Модерация: Удалено сообщение\n"
-                    f"Пользователь: {message.from_user.get_mention(as_html=True)} (ID: {message.from_user.id})\n"
-                    f"Чат: {message.chat.title} (ID: {message.chat.id})\n"
-                    f"Причина: Запрещенное слово"
-                )
+    if banned_words_matcher.search(message_text, message.chat.id):
+        try:
+            await message.delete()
+            warning_msg = (
+                f"Сообщение от {message.from_user.get_mention(as_html=True)} удалено "
+                f"из-за использования запрещенного слова."
+            )
+            sent_msg = await message.answer(warning_msg)
+
+            # Notify creator about moderation action
+            await notify_creator(
+                f"🚫 Модерация: Удалено сообщение\n"
+                f"Пользователь: {message.from_user.get_mention(as_html=True)} (ID: {message.from_user.id})\n"
+                f"Чат: {message.chat.title} (ID: {message.chat.id})\n"
+                f"Причина: Запрещенное слово"
+            )
 
-                logger.info(
-                    f"Deleted message from user {message.from_user.id} "
-                    f"containing banned word. Chat ID: {message.chat.id}"
-                )
+            logger.info(
+                f"Deleted message from user {message.from_user.id} "
+                f"containing banned word. Chat ID: {message.chat.id}"
+            )
 
-                await asyncio.sleep(30)
-                await sent_msg.delete()
-            except Exception as e:
-                logger.error(f"Failed to handle banned message: {e}")
-            break
+            deletion_scheduler.schedule(sent_msg.chat.id, sent_msg.message_id, WARNING_TTL)
+        except Exception as e:
+            logger.error(f"Failed to handle banned message: {e}")
 
 async def notify_creator(message: str):
     """Send notification to bot creator."""
@@ -546,6 +551,7 @@ async def main():
 
             # Запуск периодической задачи для пинга
             asyncio.create_task(send_periodic_ping())
+            deletion_scheduler.start(bot)
 
             # Start polling with clean updates
             await bot.delete_webhook(drop_pending_updates=True)
@@ -560,6 +566,7 @@ async def main():
             logger.info(f"Restarting bot in {wait_time} seconds...")
             await asyncio.sleep(wait_time)
         finally:
+            await deletion_scheduler.stop()
             if bot is not None:
                 try:
                     await bot.session.close()
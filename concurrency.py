@@ -0,0 +1,167 @@
+"""
+Bounded parallelism for Telegram handlers.
+
+Updates already run as separate tasks (polling with handle_as_tasks, webhook
+updates via run_coroutine_threadsafe), so nothing stops a burst of /stats from
+occupying the bot with hundreds of slow Arizona API calls. This middleware caps
+handlers running at once and, separately, the expensive commands. A request
+over capacity gets a short "busy" reply instead of waiting in line, so cheap
+commands like /rules keep their latency during a /stats storm.
+
+A handler waiting for something that isn't work (an outgoing message held
+back by a chat's rate limit) can hand its slot back with released_slot(), so
+replies piling up in one busy group don't starve every other chat.
+"""
+
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.filters import CommandObject
+from aiogram.types import Message
+
+from config import MAX_CONCURRENT_UPDATES, SERVERS_CONCURRENCY, STATS_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+QUEUE_TIMEOUT = 2.0        # сколько обновление может ждать общий слот, прежде чем получить отказ
+BUSY_MESSAGE = "⏳ Бот сейчас перегружен, попробуйте через несколько секунд."
+
+# Медленные команды (ходят во внешний API) и их собственные лимиты
+COMMAND_LIMITS: Dict[str, int] = {
+    "stats": STATS_CONCURRENCY,
+    "servers": SERVERS_CONCURRENCY,
+}
+
+
+class Limit:
+    """Non-blocking counting semaphore with load counters."""
+
+    __slots__ = ("name", "capacity", "active", "peak", "handled", "shed")
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.active = 0
+        self.peak = 0
+        self.handled = 0
+        self.shed = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.capacity:
+            self.shed += 1
+            return False
+        self.handled += 1
+        self.take()
+        return True
+
+    def take(self):
+        self.active += 1
+        if self.active > self.peak:
+            self.peak = self.active
+
+    def release(self):
+        self.active -= 1
+
+    def format(self) -> str:
+        return (f"{self.name}: {self.active}/{self.capacity} сейчас, пик {self.peak}, "
+                f"выполнено {self.handled}, отклонено {self.shed}")
+
+
+class Slot:
+    """The global slot of one running handler; can be given back while it waits."""
+
+    __slots__ = ("middleware", "held")
+
+    def __init__(self, middleware: "ConcurrencyMiddleware"):
+        self.middleware = middleware
+        self.held = True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.middleware.total.release()
+            self.middleware._slots.release()
+
+    async def reacquire(self):
+        # Обработчик уже был допущен, поэтому ждёт слот без QUEUE_TIMEOUT
+        await self.middleware._slots.acquire()
+        self.held = True
+        self.middleware.total.take()
+
+
+_slot: contextvars.ContextVar[Optional[Slot]] = contextvars.ContextVar("concurrency_slot", default=None)
+
+
+@asynccontextmanager
+async def released_slot() -> AsyncIterator[None]:
+    """Give the current handler's global slot to other updates for the duration of the block."""
+    slot = _slot.get()
+    if slot is None or not slot.held:
+        yield
+        return
+    slot.release()
+    try:
+        yield
+    finally:
+        await slot.reacquire()
+
+
+class ConcurrencyMiddleware(BaseMiddleware):
+    """Global and per-command concurrency limits for message handlers.
+
+    Registered as an inner middleware, so it only sees messages that matched
+    a handler: moderation and flood control are never shed.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_UPDATES,
+                 command_limits: Optional[Dict[str, int]] = None,
+                 queue_timeout: float = QUEUE_TIMEOUT):
+        limits = COMMAND_LIMITS if command_limits is None else command_limits
+        self.commands = {name: Limit(f"/{name}", capacity) for name, capacity in limits.items()}
+        self.total = Limit("всего", max_concurrent)
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        command: Optional[CommandObject] = data.get("command")
+        limit = self.commands.get(command.command.lower()) if command else None
+
+        # Сначала лимит команды: шторм /stats отсекается сразу, не занимая общие слоты
+        if limit is not None and not limit.try_acquire():
+            return await self.reject(event)
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.total.shed += 1
+                return await self.reject(event)
+            self.total.try_acquire()
+            slot = Slot(self)
+            token = _slot.set(slot)
+            try:
+                return await handler(event, data)
+            finally:
+                _slot.reset(token)
+                slot.release()
+        finally:
+            if limit is not None:
+                limit.release()
+
+    async def reject(self, message: Message):
+        logger.debug(f"Shed update from chat {message.chat.id}: {message.text!r}")
+        try:
+            await message.answer(BUSY_MESSAGE)
+        except Exception as e:
+            logger.debug(f"Failed to send busy reply: {e}")
+
+    def format(self) -> str:
+        return "\n".join(limit.format() for limit in (self.total, *self.commands.values()))
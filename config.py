@@ -13,6 +13,45 @@ RANK_FILE: Final = "data/rank.json"
 ADMINS_FILE: Final = "data/admins.json"
 BANNED_WORDS_FILE: Final = "data/banned_words.json"
 INFO_FILE: Final = "data/info.json"
+CHATS_FILE: Final = "data/chats.json"  # Per-chat overrides of rules/info/rank/words
+PENDING_DELETIONS_FILE: Final = "data/pending_deletions.json"  # Scheduled deletions, kept across restarts
+STATUS_BOARDS_FILE: Final = "data/status_boards.json"  # Pinned server-status messages per chat
+
+# Storage backend: "json" (default) or "sqlite"
+STORAGE_BACKEND: Final = os.environ.get("STORAGE_BACKEND", "json")
+SQLITE_DB_FILE: Final = os.environ.get("SQLITE_DB_FILE", "data/mensem.db")
+# How many chats keep their settings in memory (LRU)
+CHAT_CACHE_SIZE: Final = int(os.environ.get("CHAT_CACHE_SIZE", "256"))
+
+# Flood control: more than FLOOD_MESSAGES messages in FLOOD_WINDOW seconds
+FLOOD_MESSAGES: Final = int(os.environ.get("FLOOD_MESSAGES", "6"))
+FLOOD_WINDOW: Final = int(os.environ.get("FLOOD_WINDOW", "10"))
+FLOOD_ACTION: Final = os.environ.get("FLOOD_ACTION", "mute")  # "mute", "delete" или "off"
+FLOOD_MUTE_MINUTES: Final = int(os.environ.get("FLOOD_MUTE_MINUTES", "60"))  # по правилам 60-180 минут
+
+# Spam: the same (or nearly the same) long message SPAM_DUPLICATES times in SPAM_TTL seconds
+SPAM_DUPLICATES: Final = int(os.environ.get("SPAM_DUPLICATES", "3"))
+SPAM_TTL: Final = int(os.environ.get("SPAM_TTL", "600"))
+SPAM_MIN_LENGTH: Final = int(os.environ.get("SPAM_MIN_LENGTH", "40"))  # короче — не проверяем
+
+# Handlers running at once; slow Arizona API commands have their own, smaller limits
+MAX_CONCURRENT_UPDATES: Final = int(os.environ.get("MAX_CONCURRENT_UPDATES", "32"))
+STATS_CONCURRENCY: Final = int(os.environ.get("STATS_CONCURRENCY", "4"))
+SERVERS_CONCURRENCY: Final = int(os.environ.get("SERVERS_CONCURRENCY", "2"))
+
+# Throttling of commands that use the Deps API quota: requests per minute per user and per group chat
+# (0 = no limit)
+STATS_USER_PER_MINUTE: Final = int(os.environ.get("STATS_USER_PER_MINUTE", "3"))
+STATS_CHAT_PER_MINUTE: Final = int(os.environ.get("STATS_CHAT_PER_MINUTE", "10"))
+SERVERS_USER_PER_MINUTE: Final = int(os.environ.get("SERVERS_USER_PER_MINUTE", "2"))
+SERVERS_CHAT_PER_MINUTE: Final = int(os.environ.get("SERVERS_CHAT_PER_MINUTE", "6"))
+
+# Pinned /statusboard messages: checked every N seconds, edits shared by all chats
+STATUS_BOARD_INTERVAL: Final = int(os.environ.get("STATUS_BOARD_INTERVAL", "60"))
+STATUS_BOARD_EDITS_PER_MINUTE: Final = int(os.environ.get("STATUS_BOARD_EDITS_PER_MINUTE", "20"))
+
+# Event loop of all entry points: "auto" (uvloop if installed), "uvloop" or "asyncio"
+LOOP_POLICY: Final = os.environ.get("LOOP_POLICY", "auto")
 
 # Message templates
 WELCOME_MESSAGE: Final = """
@@ -1,83 +1,215 @@
-import json
-import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from config import RULES_FILE, ADMINS_FILE, BANNED_WORDS_FILE, INFO_FILE, RANK_FILE
+import threading
+import weakref
+from collections import defaultdict, OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Optional, FrozenSet, Callable, Any
+from config import CHAT_CACHE_SIZE
+from patterns import canonical_pattern
+from storage import StorageBackend, create_storage
 
 logger = logging.getLogger(__name__)
 
-class DataManager:
+# Keys published in DataChange events
+RULES = "rules"
+INFO = "info"
+RANK = "rank"
+ADMINS = "admins"
+WORDS = "words"
+FAMILY_CHAT_ID = "family_chat_id"
+
+
+@dataclass(frozen=True)
+class DataChange:
+    """Published after every successful mutation."""
+    key: str
+    old_version: int
+    new_version: int
+    chat_id: Optional[int] = None  # None = global scope
+
+
+class ChatSettings:
+    """Memory-resident overrides of one chat (None = use the global value)."""
+    __slots__ = ("rules", "info", "rank", "words")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.rules: Optional[str] = data.get(RULES)
+        self.info: Optional[str] = data.get(INFO)
+        self.rank: Optional[str] = data.get(RANK)
+        self.words: tuple = tuple(data.get(WORDS, ()))
+
+
+class _SharedState:
+    """Caches, versions and subscribers of one storage, shared by all its DataManagers."""
+
     def __init__(self):
-        self._ensure_data_files_exist()
-
-    def _ensure_data_files_exist(self):
-        """Ensure all required data files exist with default values."""
-        if not os.path.exists('data'):
-            os.makedirs('data')
-
-        default_files = {
-            RULES_FILE: {"rules": "Правила пока не установлены."},
-            RANK_FILE: {"rank": "Правила пока не установлены."},
-            ADMINS_FILE: {"admins": [6766653541, 8259872971]},
-            BANNED_WORDS_FILE: {"words": []},
-            INFO_FILE: {"info": "Информация пока не установлена."},
-            "data/rank.json": {"rank_message": "Информация о рангах пока не установлена."} 
-        }
-
-        for file_path, default_data in default_files.items():
-            if not os.path.exists(file_path):
-                with open(file_path, 'w') as f:
-                    json.dump(default_data, f, indent=4)
-
-    def _read_json(self, file_path: str) -> Dict[str, Any]:
-        """Read data from JSON file."""
-        try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-            return {}
+        self.versions: Dict[str, int] = defaultdict(int)
+        # key (None = все ключи) -> [(callback, loop для async-подписчиков)]
+        self.subscribers: Dict[Optional[str], List[tuple]] = defaultdict(list)
+        self.pending_tasks = set()
+
+        # Глобальные значения и LRU настроек чатов держим в памяти
+        self.settings: Dict[str, Any] = {}
+        self.words: Optional[List[str]] = None
+        self.chats: "OrderedDict[int, ChatSettings]" = OrderedDict()
+
+
+_default_storage: Optional[StorageBackend] = None
+_states: "weakref.WeakKeyDictionary[StorageBackend, _SharedState]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def default_storage() -> StorageBackend:
+    """The process-wide backend used by every DataManager() created without one."""
+    global _default_storage
+    with _lock:
+        if _default_storage is None:
+            # JSON по умолчанию, SQLite через STORAGE_BACKEND=sqlite
+            _default_storage = create_storage()
+        return _default_storage
+
+
+class DataManager:
+    """Settings, admins and banned words with in-memory caches and change events.
+
+    Every DataManager on the same storage (all of DataManager() included)
+    shares one cache and one set of subscribers, so a write made through any
+    of them is seen by all readers and published to all subscribers.
+    """
+
+    def __init__(self, storage: Optional[StorageBackend] = None):
+        self.storage = storage or default_storage()
+        with _lock:
+            state = _states.get(self.storage)
+            if state is None:
+                state = _states[self.storage] = _SharedState()
+        self._state = state
+        self.chat_cache_size = CHAT_CACHE_SIZE
+
+    # -----------------------------
+    # Change notifications
+    # -----------------------------
+    def version(self, key: str) -> int:
+        """Current version of a key; increments on every mutation."""
+        return self._state.versions[key]
 
-    def _write_json(self, file_path: str, data: Dict[str, Any]) -> bool:
-        """Write data to JSON file."""
+    def subscribe(self, callback: Callable[[DataChange], Any], *keys: str):
+        """Subscribe to changes of the given keys (all keys if none given).
+
+        Sync callbacks run inline right after the write, so caches are never
+        stale for the next read. Coroutine callbacks are scheduled as tasks on
+        the loop that was running when they subscribed (thread-safe).
+        """
+        loop = None
+        if asyncio.iscoroutinefunction(callback):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        for key in keys or (None,):
+            self._state.subscribers[key].append((callback, loop))
+
+    def unsubscribe(self, callback: Callable[[DataChange], Any]):
+        subscribers = self._state.subscribers
+        for key, callbacks in subscribers.items():
+            subscribers[key] = [s for s in callbacks if s[0] != callback]
+
+    def _publish(self, key: str, chat_id: Optional[int] = None):
+        state = self._state
+        old_version = state.versions[key]
+        state.versions[key] = old_version + 1
+        event = DataChange(key, old_version, old_version + 1, chat_id)
+
+        for callback, loop in state.subscribers.get(key, []) + state.subscribers.get(None, []):
+            if asyncio.iscoroutinefunction(callback):
+                self._schedule(callback, event, loop)
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in change subscriber for '{key}': {e}")
+
+    def _schedule(self, callback: Callable, event: DataChange, loop: Optional[asyncio.AbstractEventLoop]):
         try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Error writing to {file_path}: {e}")
-            return False
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        loop = loop or running
+        if loop is None or loop.is_closed():
+            logger.warning(f"No event loop for async subscriber of '{event.key}', event dropped")
+            return
+
+        def create_task():
+            task = loop.create_task(callback(event))
+            self._state.pending_tasks.add(task)
+            task.add_done_callback(self._state.pending_tasks.discard)
+
+        if loop is running:
+            create_task()
+        else:
+            loop.call_soon_threadsafe(create_task)
+
+    def _mutated(self, key: str, ok: bool, chat_id: Optional[int] = None) -> bool:
+        if ok:
+            if chat_id is not None:
+                self._state.chats.pop(chat_id, None)
+            self._publish(key, chat_id)
+        return ok
+
+    # -----------------------------
+    # Cached settings (global + per-chat)
+    # -----------------------------
+    def _chat(self, chat_id: int) -> ChatSettings:
+        """Chat overrides from the LRU; at most chat_cache_size chats stay in memory."""
+        chats = self._state.chats
+        chat = chats.get(chat_id)
+        if chat is not None:
+            chats.move_to_end(chat_id)
+            return chat
+        chat = chats[chat_id] = ChatSettings(self.storage.get_chat(chat_id))
+        if len(chats) > self.chat_cache_size:
+            chats.popitem(last=False)
+        return chat
+
+    def _get_setting(self, key: str, chat_id: Optional[int], default: str) -> str:
+        if chat_id is not None:
+            value = getattr(self._chat(chat_id), key)
+            if value:
+                return value
+        settings = self._state.settings
+        if key not in settings:
+            settings[key] = self.storage.get_setting(key)
+        return settings[key] or default
+
+    def _set_setting(self, key: str, value: Any, chat_id: Optional[int] = None) -> bool:
+        if chat_id is None:
+            ok = self.storage.set_setting(key, value)
+            if ok:
+                self._state.settings[key] = value
+        else:
+            ok = self.storage.set_chat_setting(chat_id, key, value)
+        return self._mutated(key, ok, chat_id)
 
     # -----------------------------
     # Rules
     # -----------------------------
-    def get_rules(self) -> str:
-        data = self._read_json(RULES_FILE)
-        return data.get("rules", "Правила пока не установлены.")
+    def get_rules(self, chat_id: Optional[int] = None) -> str:
+        return self._get_setting(RULES, chat_id, "Правила пока не установлены.")
 
-    def set_rules(self, rules: str) -> bool:
-        return self._write_json(RULES_FILE, {"rules": rules})
+    def set_rules(self, rules: str, chat_id: Optional[int] = None) -> bool:
+        return self._set_setting(RULES, rules, chat_id)
 
     # -----------------------------
     # Admins
     # -----------------------------
     def get_admins(self) -> dict:
         """Get admins as dict[str, username]. Always returns dict for consistency."""
-        data = self._read_json(ADMINS_FILE)
-        admins = data.get("admins", [])
-
-        # Конвертируем старый формат list[int] в dict[str, username]
-        if isinstance(admins, list):
-            admin_dict = {str(admin_id): f"ID_{admin_id}" for admin_id in admins}
-            # Обновляем JSON
-            self._write_json(ADMINS_FILE, {"admins": admin_dict})
-            return admin_dict
+        return self.storage.get_admins()
 
-        # Если уже dict — оставляем как есть
-        elif isinstance(admins, dict):
-            return admins
-
-        return {}
+    def get_admin_ids(self) -> FrozenSet[int]:
+        """Get prebuilt frozenset of admin IDs (no disk access)."""
+        return self.storage.get_admin_ids()
 
     def get_admin_usernames(self) -> Dict[int, str]:
         """Get dict of admin IDs to usernames."""
@@ -86,78 +218,79 @@ class DataManager:
 
     def add_admin(self, admin_id: int, username: str = None) -> bool:
         """Add new admin with username."""
-        admins = self.get_admins()
-        admin_id_str = str(admin_id)
-        if admin_id_str not in admins:
-            admins[admin_id_str] = username or f"ID_{admin_id}"
-            return self._write_json(ADMINS_FILE, {"admins": admins})
-        return False
+        return self._mutated(ADMINS, self.storage.add_admin(admin_id, username or f"ID_{admin_id}"))
 
     def remove_admin(self, admin_id: int) -> bool:
         """Remove admin."""
-        admins = self.get_admins()
-        admin_id_str = str(admin_id)
-        if admin_id_str in admins:
-            del admins[admin_id_str]
-            return self._write_json(ADMINS_FILE, {"admins": admins})
-        return False
+        return self._mutated(ADMINS, self.storage.remove_admin(admin_id))
 
     def is_admin(self, user_id: int) -> bool:
         """Check if user is admin."""
-        admins = self.get_admins()
-        return str(user_id) in admins
+        return self.storage.has_admin(user_id)
 
     # -----------------------------
     # Banned words
     # -----------------------------
-    def get_banned_words(self) -> List[str]:
-        data = self._read_json(BANNED_WORDS_FILE)
-        return data.get("words", [])
+    def get_banned_words(self, chat_id: Optional[int] = None) -> List[str]:
+        """Global words, plus the chat's own additions when chat_id is given."""
+        state = self._state
+        if state.words is None:
+            state.words = self.storage.get_words()
+        words = list(state.words)
+        if chat_id is not None:
+            chat_words = self._chat(chat_id).words
+            if chat_words:
+                known = set(words)
+                words.extend(w for w in chat_words if w not in known)
+        return words
+
+    def get_chat_banned_words(self, chat_id: int) -> List[str]:
+        """Only the chat's own additions to the global list."""
+        return list(self._chat(chat_id).words)
 
-    def add_banned_word(self, word: str) -> bool:
-        data = self._read_json(BANNED_WORDS_FILE)
-        words = data.get("words", [])
-        if word.lower() not in words:
-            words.append(word.lower())
-            return self._write_json(BANNED_WORDS_FILE, {"words": words})
-        return False
+    def add_banned_word(self, word: str, chat_id: Optional[int] = None) -> bool:
+        """Word, glob or `re:` pattern (see patterns.py); validate with validate_pattern first."""
+        word = canonical_pattern(word)
+        if chat_id is not None:
+            return self._mutated(WORDS, self.storage.add_chat_word(chat_id, word), chat_id)
+        self._state.words = None
+        return self._mutated(WORDS, self.storage.add_word(word))
 
-    def remove_banned_word(self, word: str) -> bool:
-        data = self._read_json(BANNED_WORDS_FILE)
-        words = data.get("words", [])
-        if word.lower() in words:
-            words.remove(word.lower())
-            return self._write_json(BANNED_WORDS_FILE, {"words": words})
-        return False
+    def remove_banned_word(self, word: str, chat_id: Optional[int] = None) -> bool:
+        word = canonical_pattern(word)
+        if chat_id is not None:
+            return self._mutated(WORDS, self.storage.remove_chat_word(chat_id, word), chat_id)
+        self._state.words = None
+        return self._mutated(WORDS, self.storage.remove_word(word))
 
     # -----------------------------
     # Info
     # -----------------------------
-    def get_info(self) -> str:
-        data = self._read_json(INFO_FILE)
-        return data.get("info", "Информация пока не установлена.")
+    def get_info(self, chat_id: Optional[int] = None) -> str:
+        return self._get_setting(INFO, chat_id, "Информация пока не установлена.")
 
-    def set_info(self, info: str) -> bool:
+    def set_info(self, info: str, chat_id: Optional[int] = None) -> bool:
         info = info.replace("<", "&lt;").replace(">", "&gt;")
-        return self._write_json(INFO_FILE, {"info": info})
+        return self._set_setting(INFO, info, chat_id)
 
     # -----------------------------
     # Rank
     # -----------------------------
-    def get_rank(self) -> str:
-        data = self._read_json("data/rank.json")
-        return data.get("rank_message", "Информация о рангах пока не установлена.")
+    def get_rank(self, chat_id: Optional[int] = None) -> str:
+        return self._get_setting(RANK, chat_id, "Информация о рангах пока не установлена.")
 
-    def set_rank(self, message: str) -> bool:
+    def set_rank(self, message: str, chat_id: Optional[int] = None) -> bool:
         message = message.replace("<", "&lt;").replace(">", "&gt;")
-        return self._write_json("data/rank.json", {"rank_message": message})
+        return self._set_setting(RANK, message, chat_id)
 
     # -----------------------------
     # Family chat ID
     # -----------------------------
     def get_family_chat_id(self) -> Optional[int]:
-        data = self._read_json(INFO_FILE)
-        family_chat = data.get("family_chat_id")
+        settings = self._state.settings
+        if FAMILY_CHAT_ID not in settings:
+            settings[FAMILY_CHAT_ID] = self.storage.get_setting(FAMILY_CHAT_ID)
+        family_chat = settings[FAMILY_CHAT_ID]
         if family_chat:
             try:
                 return int(family_chat)
@@ -167,10 +300,7 @@ class DataManager:
 
     def set_family_chat_id(self, chat_id: int) -> bool:
         try:
-            data = self._read_json(INFO_FILE)
-            data["family_chat_id"] = chat_id
-            self._write_json(INFO_FILE, data)
-            return True
+            return self._set_setting(FAMILY_CHAT_ID, chat_id)
         except Exception as e:
             logger.error(f"Error setting family chat ID: {e}")
             return False
@@ -0,0 +1,148 @@
+"""
+Central scheduler for delayed message deletion ("delete message X in chat Y at T").
+
+One background task and a heap of due times replace a sleeping coroutine per
+moderation warning. Jobs due within the same tick are grouped per chat and
+removed with one deleteMessages call. Pending jobs are written to disk, so
+they survive restarts (RestartScheduler, deploys, crashes between saves).
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+
+from config import PENDING_DELETIONS_FILE
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 1.0
+SAVE_INTERVAL = 10.0       # как часто сбрасывать изменения на диск
+DELETE_BATCH_LIMIT = 100   # максимум message_ids в одном deleteMessages
+MAX_JOB_AGE = 48 * 3600    # старше 48 часов бот удалять уже не может
+
+
+class DeletionScheduler:
+    """Heap of (due timestamp, chat_id, message_id), drained once per tick."""
+
+    def __init__(self, path: Optional[str] = PENDING_DELETIONS_FILE, tick: float = TICK_SECONDS):
+        self.path = path
+        self.tick = tick
+        self.deleted = 0
+        self.failed = 0
+        self._heap: List[Tuple[float, int, int]] = []
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, chat_id: int, message_id: int, delay: float):
+        """Delete the message after `delay` seconds (wall clock, survives restarts)."""
+        heapq.heappush(self._heap, (time.time() + delay, chat_id, message_id))
+        self._dirty = True
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def start(self, bot: Bot):
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Deletion scheduler started, pending jobs: {len(self._heap)}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+                if self._dirty and time.time() - self._last_save >= SAVE_INTERVAL:
+                    self.save()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Deletion scheduler tick failed: {e}")
+            await asyncio.sleep(self.tick)
+
+    def pop_due(self, now: Optional[float] = None) -> Dict[int, List[int]]:
+        """Remove due jobs from the heap, grouped by chat."""
+        now = time.time() if now is None else now
+        batches: Dict[int, List[int]] = defaultdict(list)
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, chat_id, message_id = heapq.heappop(heap)
+            if now - due > MAX_JOB_AGE:
+                continue
+            batches[chat_id].append(message_id)
+        if batches:
+            self._dirty = True
+        return batches
+
+    async def run_once(self, now: Optional[float] = None):
+        if self._bot is None:
+            return
+        for chat_id, message_ids in self.pop_due(now).items():
+            for i in range(0, len(message_ids), DELETE_BATCH_LIMIT):
+                await self._delete(chat_id, message_ids[i:i + DELETE_BATCH_LIMIT])
+
+    async def _delete(self, chat_id: int, message_ids: List[int]):
+        try:
+            if len(message_ids) == 1:
+                await self._bot.delete_message(chat_id, message_ids[0])
+            else:
+                await self._bot.delete_messages(chat_id, message_ids)
+            self.deleted += len(message_ids)
+        except Exception as e:
+            # Сообщение уже удалено вручную или бот потерял права — повторять нет смысла
+            self.failed += len(message_ids)
+            logger.debug(f"Failed to delete {len(message_ids)} message(s) in chat {chat_id}: {e}")
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                jobs = json.load(f).get("jobs", [])
+            self._heap = [(float(due), int(chat_id), int(message_id)) for due, chat_id, message_id in jobs]
+            heapq.heapify(self._heap)
+            if self._heap:
+                logger.info(f"Loaded {len(self._heap)} pending deletions from {self.path}")
+        except Exception as e:
+            logger.error(f"Error reading {self.path}: {e}")
+
+    def save(self) -> bool:
+        if not self.path:
+            return False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({"jobs": sorted(self._heap)}, f)
+            os.replace(tmp_path, self.path)  # атомарно: файл не обрежется при падении
+            self._dirty = False
+            self._last_save = time.time()
+            return True
+        except Exception as e:
+            logger.error(f"Error writing to {self.path}: {e}")
+            return False
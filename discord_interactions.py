@@ -8,12 +8,13 @@ import json
 import logging
 import hashlib
 import hmac
-import asyncio
 import aiohttp
 from flask import Flask, request, jsonify
 from typing import Dict, Any, Optional
-from data_manager import DataManager
+from data_manager import DataManager, RULES, INFO, RANK
+from responses import ResponseCache
 from unified_config import API_KEY
+import event_loop
 
 # Попытаемся импортировать ArizonaAPI, если доступен
 try:
@@ -23,10 +24,31 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Ответ на /help не зависит от данных — собирается один раз при импорте
+HELP_RESPONSE: Dict[str, Any] = {'type': 4, 'data': {'embeds': [{
+    'title': '📋 Список команд MensemBot',
+    'description': 'Доступные команды для Discord',
+    'color': 0x00ff00,
+    'fields': [
+        {
+            'name': '📝 Основные команды',
+            'value': '/help - Показать эту справку\n/rules - Правила сервера\n/info - Информация\n/rank - Информация о рангах',
+            'inline': False
+        },
+        {
+            'name': '🎮 Arizona RP',
+            'value': '/stats - Статистика игрока\n/servers - Список серверов',
+            'inline': False
+        }
+    ]
+}]}}
+
 class DiscordInteractionsHandler:
-    def __init__(self, data_manager: DataManager, arizona_api: Optional[Any] = None):
+    def __init__(self, data_manager: DataManager, arizona_api: Optional[Any] = None,
+                 responses: Optional[ResponseCache] = None):
         self.data_manager = data_manager
         self.arizona_api = arizona_api
+        self.responses = responses if responses is not None else ResponseCache(data_manager)
         self.application_id = os.getenv('DISCORD_APPLICATION_ID')
         self.public_key = os.getenv('DISCORD_PUBLIC_KEY')
         self.bot_token = os.getenv('DISCORD_TOKEN')
@@ -100,55 +122,19 @@ class DiscordInteractionsHandler:
     
     async def cmd_help(self) -> Dict[str, Any]:
         """Команда помощи"""
-        embed = {
-            'title': '📋 Список команд MensemBot',
-            'description': 'Доступные команды для Discord',
-            'color': 0x00ff00,
-            'fields': [
-                {
-                    'name': '📝 Основные команды',
-                    'value': '/help - Показать эту справку\n/rules - Правила сервера\n/info - Информация\n/rank - Информация о рангах',
-                    'inline': False
-                },
-                {
-                    'name': '🎮 Arizona RP',
-                    'value': '/stats - Статистика игрока\n/servers - Список серверов',
-                    'inline': False
-                }
-            ]
-        }
-        
-        return {'type': 4, 'data': {'embeds': [embed]}}
+        return HELP_RESPONSE
     
     async def cmd_rules(self) -> Dict[str, Any]:
         """Команда правил"""
-        rules = self.data_manager.get_rules()
-        embed = {
-            'title': '📋 Правила сервера',
-            'description': rules,
-            'color': 0x0099ff
-        }
-        return {'type': 4, 'data': {'embeds': [embed]}}
+        return self.responses.discord(RULES)
     
     async def cmd_info(self) -> Dict[str, Any]:
         """Команда информации"""
-        info = self.data_manager.get_info()
-        embed = {
-            'title': 'ℹ️ Информация',
-            'description': info,
-            'color': 0x00ff99
-        }
-        return {'type': 4, 'data': {'embeds': [embed]}}
+        return self.responses.discord(INFO)
     
     async def cmd_rank(self) -> Dict[str, Any]:
         """Команда рангов"""
-        rank_info = self.data_manager.get_rank()
-        embed = {
-            'title': '🏆 Ранги',
-            'description': rank_info,
-            'color': 0xffd700
-        }
-        return {'type': 4, 'data': {'embeds': [embed]}}
+        return self.responses.discord(RANK)
     
     async def cmd_servers(self) -> Dict[str, Any]:
         """Команда серверов Arizona RP с статусом"""
@@ -244,7 +230,7 @@ def create_discord_webhook_handler(app: Flask, data_manager: DataManager):
             if not interaction_data:
                 return jsonify({'error': 'Invalid JSON data'}), 400
             
-            response = asyncio.run(handler.handle_interaction(interaction_data))
+            response = event_loop.run(handler.handle_interaction(interaction_data))
             return jsonify(response)
         except Exception as e:
             logger.error(f"Discord interaction error: {e}")
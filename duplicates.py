@@ -0,0 +1,174 @@
+"""
+Near-duplicate spam detection.
+
+Every long enough message gets a one-permutation MinHash sketch of the
+character 3-shingles of its normalized text: each shingle hash falls into
+one of BINS bins by its low bits, and a bin keeps the smallest hash it got
+(empty bins borrow from the next filled one). Two sketches agree in a bin
+with probability close to the Jaccard similarity of the shingle sets, so
+the share of equal bins estimates it. Fingerprints of recent messages sit
+in one index shared by all chats: BANDS bands of ROWS bins find candidates,
+and a candidate counts as a copy when the estimated similarity is at least
+MIN_SIMILARITY.
+
+MIN_SIMILARITY was chosen from this table: the share of edited copies
+caught, with random one-letter substitutions, insertions and deletions
+(500 runs each), and how many of 1500 unrelated messages built from the
+same 30 words were flagged as a copy of an earlier one:
+
+    edits                     1     2     3     5     8   unrelated
+    0.60  100-char ad       100%  100%  100%  100%   96%    233
+          40-char ad        100%   98%   82%   37%    5%
+    0.65  100-char ad       100%  100%  100%  100%   79%     62
+          40-char ad        100%   93%   66%   18%    2%
+    0.70  100-char ad       100%  100%  100%   98%   53%     10
+          40-char ad         99%   80%   51%   12%    1%
+
+The previous 64-bit SimHash with a 3-bit threshold caught only 30%, 12% and
+4% of the 100-character copies with 1, 2 and 3 edits.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from config import SPAM_DUPLICATES, SPAM_MIN_LENGTH, SPAM_TTL
+from normalization import normalize
+
+MASK = (1 << 64) - 1
+BIN_BITS = 6
+BINS = 1 << BIN_BITS
+BANDS = 16
+ROWS = BINS // BANDS
+EMPTY = 1 << 64             # в корзину не попал ни один шингл
+MIN_SIMILARITY = 0.7
+
+SHINGLE = 3
+MAX_CHARS = 400             # отпечаток по началу сообщения: реклама узнаётся и так
+MAX_ENTRIES = 20000         # предел индекса независимо от TTL
+
+Sketch = Tuple[int, ...]
+BandKey = Tuple[int, ...]
+
+
+def sketch(text: str) -> Sketch:
+    """One-permutation MinHash of the normalized text over distinct character shingles."""
+    mins = [EMPTY] * BINS
+    for shingle in {text[i:i + SHINGLE] for i in range(max(1, len(text) - SHINGLE + 1))}:
+        h = hash(shingle) & MASK
+        value = h >> BIN_BITS
+        if value < mins[h & (BINS - 1)]:
+            mins[h & (BINS - 1)] = value
+    # Уплотнение: пустая корзина берёт значение ближайшей непустой справа (по кругу)
+    # со сдвигом на расстояние до неё, так что у похожих текстов совпадает и она
+    if EMPTY in mins and len(mins) != mins.count(EMPTY):
+        filled = list(mins)
+        for i in range(BINS):
+            if mins[i] == EMPTY:
+                step = 1
+                while mins[(i + step) % BINS] == EMPTY:
+                    step += 1
+                filled[i] = mins[(i + step) % BINS] + step * EMPTY
+        mins = filled
+    return tuple(mins)
+
+
+def similarity(a: Sketch, b: Sketch) -> float:
+    """Estimated Jaccard similarity: the share of equal bins."""
+    return sum(x == y for x, y in zip(a, b)) / BINS
+
+
+def band_keys(fingerprint: Sketch) -> Iterator[Tuple[int, BandKey]]:
+    for band in range(BANDS):
+        yield band, fingerprint[band * ROWS:(band + 1) * ROWS]
+
+
+class Duplicate(NamedTuple):
+    copies: int             # сколько похожих сообщений уже было в окне (без текущего)
+    chats: int              # в скольких разных чатах
+    similarity: float       # наибольшая оценка сходства с ними
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "chat_id", "user_id", "expires")
+
+    def __init__(self, fingerprint: Sketch, chat_id: int, user_id: int, expires: float):
+        self.fingerprint = fingerprint
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.expires = expires
+
+
+class DuplicateIndex:
+    """Time-bounded fingerprint index shared by all moderated chats."""
+
+    def __init__(self, ttl: float = SPAM_TTL, min_length: int = SPAM_MIN_LENGTH,
+                 threshold: int = SPAM_DUPLICATES, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.min_length = min_length
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._next_id = 0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # в порядке добавления
+        self._bands: List[Dict[BandKey, Set[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int, entry: _Entry):
+        for band, key in band_keys(entry.fingerprint):
+            table = self._bands[band]
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del table[key]
+
+    def _expire(self, now: float):
+        entries = self._entries
+        while entries:
+            entry_id, entry = next(iter(entries.items()))
+            if entry.expires > now and len(entries) <= self.max_entries:
+                break
+            del entries[entry_id]
+            self._remove(entry_id, entry)
+
+    def _similar(self, fingerprint: Sketch) -> Iterator[Tuple[_Entry, float]]:
+        """Indexed entries at least MIN_SIMILARITY alike, each yielded once."""
+        seen: Set[int] = set()
+        for band, key in band_keys(fingerprint):
+            for entry_id in self._bands[band].get(key, ()):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                entry = self._entries[entry_id]
+                score = similarity(fingerprint, entry.fingerprint)
+                if score >= MIN_SIMILARITY:
+                    yield entry, score
+
+    def add(self, text: str, chat_id: int, user_id: int, now: Optional[float] = None) -> Optional[Duplicate]:
+        """Index the message; returns a Duplicate once it has `threshold` copies in the window."""
+        normalized = normalize(text[:MAX_CHARS]).text
+        if len(normalized) < self.min_length:
+            return None
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        fingerprint = sketch(normalized)
+        copies, chats, best = 0, {chat_id}, 0.0
+        for entry, score in self._similar(fingerprint):
+            copies += 1
+            chats.add(entry.chat_id)
+            best = max(best, score)
+            if copies + 1 >= self.threshold:
+                break  # во время волны спама кандидатов тысячи — дальше считать незачем
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _Entry(fingerprint, chat_id, user_id, now + self.ttl)
+        for band, key in band_keys(fingerprint):
+            self._bands[band].setdefault(key, set()).add(entry_id)
+
+        if copies + 1 >= self.threshold:
+            return Duplicate(copies, len(chats), best)
+        return None
@@ -0,0 +1,61 @@
+"""
+Event loop selection shared by all entry points.
+
+LOOP_POLICY picks the loop:
+  auto     - uvloop if it is installed, otherwise the standard asyncio loop
+  uvloop   - uvloop; if it can't be imported, a warning and the asyncio loop
+  asyncio  - always the standard loop
+
+The loop is created through asyncio.Runner's loop_factory rather than a
+global event loop policy, so the bot thread of render_bot gets the same kind
+of loop as the main thread and Flask's threads are left alone. Importing
+aiogram installs uvloop's global policy whenever uvloop is importable, after
+which asyncio.new_event_loop() returns a uvloop loop too; the standard loop
+is therefore built from asyncio's default policy directly.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+from config import LOOP_POLICY
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("auto", "uvloop", "asyncio")
+
+T = TypeVar("T")
+
+
+def asyncio_loop() -> asyncio.AbstractEventLoop:
+    """The standard library loop, whatever global policy is installed."""
+    return asyncio.DefaultEventLoopPolicy().new_event_loop()
+
+
+def loop_factory(policy: Optional[str] = None) -> Callable[[], asyncio.AbstractEventLoop]:
+    """Constructor of new event loops for the given (or configured) policy."""
+    policy = (policy or LOOP_POLICY).lower()
+    if policy not in POLICIES:
+        logger.warning(f"Unknown LOOP_POLICY '{policy}', using auto")
+        policy = "auto"
+    if policy == "asyncio":
+        return asyncio_loop
+    try:
+        import uvloop
+    except ImportError:
+        if policy == "uvloop":
+            logger.warning("LOOP_POLICY=uvloop, but uvloop is not installed: using the asyncio loop")
+        return asyncio_loop
+    return uvloop.new_event_loop
+
+
+def loop_name(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    """'uvloop' or 'asyncio' for the running (or given) loop."""
+    loop = loop or asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+
+def run(main: Coroutine[Any, Any, T], policy: Optional[str] = None) -> T:
+    """asyncio.run() on the configured loop."""
+    with asyncio.Runner(loop_factory=loop_factory(policy)) as runner:
+        return runner.run(main)
@@ -1,31 +1,55 @@
+from typing import Optional, FrozenSet
 from aiogram import types
 from aiogram.filters import BaseFilter
 from config import CREATOR_ID
-from data_manager import DataManager
+from data_manager import DataManager, DataChange, ADMINS
+
+
+class PermissionSet:
+    """In-memory admin/creator permissions shared by IsAdmin and IsCreator.
+
+    Created once at dispatcher setup (dp["permissions"]) from the same
+    DataManager that handles /addadmin and /unadmin, and rebuilt lazily after
+    it publishes an "admins" change. IsAdmin requires it: a set built from
+    another DataManager would never see those changes.
+    """
+    def __init__(self, data_manager: DataManager, creator_id: int = CREATOR_ID):
+        self.data_manager = data_manager
+        self.creator_id = creator_id
+        self._admin_ids: Optional[FrozenSet[int]] = None
+        data_manager.subscribe(self._on_change, ADMINS)
+
+    def _on_change(self, event: DataChange):
+        self.invalidate()
+
+    def invalidate(self):
+        self._admin_ids = None
+
+    def is_creator(self, user_id: int) -> bool:
+        return user_id == self.creator_id
+
+    def is_admin(self, user_id: int) -> bool:
+        """Admins and the creator. Disk is never touched here."""
+        admin_ids = self._admin_ids
+        if admin_ids is None:
+            admin_ids = self._admin_ids = self.data_manager.get_admin_ids() | {self.creator_id}
+        return user_id in admin_ids
+
 
 class IsAdmin(BaseFilter):
     """Filter for checking if user is admin."""
     def __init__(self, *args, **kwargs):
         self.is_admin = True
 
-    async def __call__(self, message: types.Message) -> bool:
-        data_manager = DataManager()
-        admins = data_manager.get_admins()  # список админов
-
-        user_id_str = str(message.from_user.id)
-
-        # Поддержка обеих форм: list[int] или dict[str, username]
-        if isinstance(admins, list):
-            return message.from_user.id in admins or message.from_user.id == CREATOR_ID
-        elif isinstance(admins, dict):
-            return user_id_str in admins or message.from_user.id == CREATOR_ID
-
-        return False
+    async def __call__(self, message: types.Message, permissions: PermissionSet) -> bool:
+        return permissions.is_admin(message.from_user.id)
 
 class IsCreator(BaseFilter):
     """Filter for checking if user is creator."""
     def __init__(self, *args, **kwargs):
         self.is_creator = True
 
-    async def __call__(self, message: types.Message) -> bool:
+    async def __call__(self, message: types.Message, permissions: Optional[PermissionSet] = None) -> bool:
+        if permissions:
+            return permissions.is_creator(message.from_user.id)
         return message.from_user.id == CREATOR_ID
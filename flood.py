@@ -0,0 +1,168 @@
+"""
+Flood control for group chats.
+Message rate per (chat, user) is counted in a ring of time buckets; users
+who went quiet for a whole window are evicted, so memory follows the number
+of currently active members, not the size of the chats. A media album
+arrives as one message per photo and is counted once.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import ChatPermissions, Message
+
+from config import FLOOD_ACTION, FLOOD_MESSAGES, FLOOD_MUTE_MINUTES, FLOOD_WINDOW
+from deletion_scheduler import DeletionScheduler
+from filters import PermissionSet
+from moderation import ModerationReporter
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = 10               # разрешение окна: FLOOD_WINDOW / BUCKETS секунд
+MAX_TRACKED = 50000        # жёсткий предел на случай наплыва участников
+NOTICE_TTL = 30            # секунд до удаления уведомления о муте
+
+MUTE = "mute"
+DELETE = "delete"
+OFF = "off"
+
+
+class FloodCounter:
+    """Messages per bucket over the last BUCKETS buckets."""
+
+    __slots__ = ("counts", "last_bucket", "total", "media_group_id")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.last_bucket = 0
+        self.total = 0
+        self.media_group_id: Optional[str] = None  # последний уже посчитанный альбом
+
+    def hit(self, bucket: int) -> int:
+        """Count one message in the given absolute bucket; returns the window total."""
+        counts = self.counts
+        elapsed = bucket - self.last_bucket
+        if elapsed >= BUCKETS:
+            counts[:] = [0] * BUCKETS
+            self.total = 0
+        else:
+            # Обнуляем корзины, выпавшие из окна с прошлого сообщения
+            for b in range(self.last_bucket + 1, bucket + 1):
+                self.total -= counts[b % BUCKETS]
+                counts[b % BUCKETS] = 0
+        counts[bucket % BUCKETS] += 1
+        self.total += 1
+        self.last_bucket = bucket
+        return self.total
+
+
+class FloodTracker:
+    """Sliding-window counters for all active (chat, user) pairs."""
+
+    def __init__(self, limit: int = FLOOD_MESSAGES, window: float = FLOOD_WINDOW,
+                 max_tracked: int = MAX_TRACKED):
+        self.limit = limit
+        self.bucket_width = window / BUCKETS
+        self.max_tracked = max_tracked
+        self._counters: "OrderedDict[Tuple[int, int], FloodCounter]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def hit(self, chat_id: int, user_id: int, now: Optional[float] = None,
+            media_group_id: Optional[str] = None) -> bool:
+        """Record a message; True when the user exceeded the limit.
+        Messages of an album after the first one are not counted."""
+        bucket = int((time.monotonic() if now is None else now) / self.bucket_width)
+        key = (chat_id, user_id)
+        counters = self._counters
+
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = FloodCounter()
+            counter.last_bucket = bucket
+        else:
+            counters.move_to_end(key)
+            if media_group_id is not None and counter.media_group_id == media_group_id:
+                return False
+        counter.media_group_id = media_group_id
+        flooding = counter.hit(bucket) > self.limit
+
+        # Порядок OrderedDict = порядок активности: с начала лежат самые давние
+        while counters:
+            oldest_key, oldest = next(iter(counters.items()))
+            if bucket - oldest.last_bucket < BUCKETS and len(counters) <= self.max_tracked:
+                break
+            del counters[oldest_key]
+        return flooding
+
+    def reset(self, chat_id: int, user_id: int):
+        self._counters.pop((chat_id, user_id), None)
+
+
+class FloodMiddleware(BaseMiddleware):
+    """Mutes (or just cleans up after) users who exceed the message rate."""
+
+    def __init__(
+        self,
+        permissions: PermissionSet,
+        scheduler: DeletionScheduler,
+        tracker: Optional[FloodTracker] = None,
+        action: str = FLOOD_ACTION,
+        mute_minutes: int = FLOOD_MUTE_MINUTES,
+        reporter: Optional[ModerationReporter] = None,
+    ):
+        self.permissions = permissions
+        self.scheduler = scheduler
+        self.tracker = tracker if tracker is not None else FloodTracker()
+        self.action = action
+        self.mute_minutes = mute_minutes
+        self.reporter = reporter
+        self.triggered = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        if self.action == OFF or event.chat.type == "private" or event.from_user is None \
+                or self.permissions.is_admin(event.from_user.id):
+            return await handler(event, data)
+
+        if not self.tracker.hit(event.chat.id, event.from_user.id, media_group_id=event.media_group_id):
+            return await handler(event, data)
+
+        self.triggered += 1
+        await self.punish(event)
+        return None
+
+    async def punish(self, message: Message):
+        user = message.from_user
+        self.scheduler.schedule(message.chat.id, message.message_id, 0)  # пачкой на ближайшем тике
+
+        if self.action != MUTE:
+            if self.reporter:
+                self.reporter.add(message, "Флуд")
+            return
+        # Счётчик сбрасываем, чтобы не мутить повторно за уже удалённые сообщения
+        self.tracker.reset(message.chat.id, user.id)
+        try:
+            await message.bot.restrict_chat_member(
+                message.chat.id, user.id,
+                permissions=ChatPermissions(can_send_messages=False),
+                until_date=timedelta(minutes=self.mute_minutes),
+            )
+            notice = await message.answer(
+                f"🔇 {user.mention_html()} получает мут на {self.mute_minutes} минут за флуд."
+            )
+            self.scheduler.schedule(notice.chat.id, notice.message_id, NOTICE_TTL)
+            logger.info(f"Muted user {user.id} for flood in chat {message.chat.id}")
+            if self.reporter:
+                self.reporter.add(message, f"Флуд, мут на {self.mute_minutes} мин.")
+        except Exception as e:
+            logger.error(f"Failed to mute user {user.id} for flood: {e}")
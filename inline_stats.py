@@ -0,0 +1,139 @@
+"""
+Inline mode: `@MensemBot Nick_Name 18` in any chat returns the player's stats.
+
+Telegram sends a new inline query on every keystroke. Each user's previous
+query task is cancelled when the next one arrives, and a query starts its
+lookup only after a short pause, so half-typed nicknames never reach the API.
+Lookups go through arizona_api.fetch_player_stats, which shares its TTL cache
+and in-flight requests with /stats. A lookup that would reach the API counts
+against the user's /stats limit (throttling.Throttler), so inline mode is not
+a way around it; a throttled user gets a personal "too often" answer. Other
+answers are not personal, so Telegram's own cache (cache_time) serves
+repeats of the same query from any user.
+"""
+
+import asyncio
+import hashlib
+import html
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+
+from arizona_api import arizona_api
+from filters import PermissionSet
+from throttling import Throttler
+
+logger = logging.getLogger(__name__)
+
+INLINE_DEBOUNCE = 0.6       # секунд тишины после последнего нажатия клавиши
+INLINE_CACHE_TIME = 60      # кэш Telegram для найденного игрока
+INLINE_ERROR_CACHE_TIME = 10
+MAX_MESSAGE_LENGTH = 4096
+
+
+class InlineAnswer(NamedTuple):
+    results: List[InlineQueryResultArticle]
+    cache_time: int
+    is_personal: bool = False
+
+
+def parse_query(text: str) -> Optional[Tuple[str, int]]:
+    """'Nick_Name 18' -> (nickname, server_id); None while the query is incomplete or invalid."""
+    parts = text.split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        return None
+    nickname, server_id = parts[0], int(parts[1])
+    if not arizona_api.validate_nickname(nickname)[0] or not arizona_api.validate_server_id(server_id)[0]:
+        return None
+    return nickname, server_id
+
+
+def article(result_id: str, title: str, description: str, text: str) -> InlineQueryResultArticle:
+    if len(text) > MAX_MESSAGE_LENGTH:
+        text = text[:MAX_MESSAGE_LENGTH - 3] + "..."
+    return InlineQueryResultArticle(
+        id=hashlib.md5(result_id.encode()).hexdigest(),
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(message_text=text),
+    )
+
+
+class InlineStats:
+    """Per-user debounced inline stats lookups."""
+
+    def __init__(self, throttler: Optional[Throttler] = None, permissions: Optional[PermissionSet] = None,
+                 debounce: float = INLINE_DEBOUNCE):
+        self.throttler = throttler if throttler is not None else Throttler()
+        self.permissions = permissions
+        self.debounce = debounce
+        self.answered = 0
+        self.superseded = 0
+        self.throttled = 0
+        self._queries: Dict[int, asyncio.Task] = {}  # user_id -> задача последнего запроса
+
+    async def handle(self, query: InlineQuery):
+        user_id = query.from_user.id
+        current = asyncio.current_task()
+        previous = self._queries.get(user_id)
+        if previous is not None and previous is not current and not previous.done():
+            previous.cancel()  # пользователь продолжил печатать
+        self._queries[user_id] = current
+        try:
+            await asyncio.sleep(self.debounce)
+            answer = await self.lookup(query.query, user_id)
+            await query.answer(answer.results, cache_time=answer.cache_time, is_personal=answer.is_personal)
+            self.answered += 1
+        except asyncio.CancelledError:
+            if self._queries.get(user_id) is current:
+                raise  # отменили не мы (остановка бота)
+            self.superseded += 1
+        except Exception as e:
+            logger.error(f"Inline query failed for user {user_id}: {e}")
+        finally:
+            if self._queries.get(user_id) is current:
+                del self._queries[user_id]
+
+    def _throttle(self, user_id: int, nickname: str, server_id: int) -> float:
+        """Seconds the user has to wait before this lookup may reach the API; 0 if it may."""
+        if arizona_api.is_player_cached(nickname, server_id):
+            return 0.0  # квоту API не тратит
+        if self.permissions is not None and self.permissions.is_admin(user_id):
+            return 0.0
+        return self.throttler.hit("stats", user_id, None)
+
+    async def lookup(self, text: str, user_id: int) -> InlineAnswer:
+        parsed = parse_query(text)
+        if parsed is None:
+            return InlineAnswer([], INLINE_ERROR_CACHE_TIME)  # неполный ввод: Telegram покажет подсказку-плейсхолдер
+        nickname, server_id = parsed
+        server_name = arizona_api.get_server_name(server_id)
+
+        wait = self._throttle(user_id, nickname, server_id)
+        if wait:
+            self.throttled += 1
+            notice = f"⏳ Слишком часто. Статистику можно будет запросить снова через {int(wait) + 1} сек."
+            result = article(f"throttled:{user_id}", f"{nickname} — {server_name}", notice, notice)
+            # Личный ответ: кэш Telegram не должен показывать его другим пользователям
+            return InlineAnswer([result], int(wait) + 1, is_personal=True)
+
+        data, error = await arizona_api.fetch_player_stats(nickname, server_id)
+        if error or not data:
+            error = error or f"❌ Игрок '{nickname}' не найден на сервере {server_id}."
+            result = article(f"error:{nickname}:{server_id}", f"{nickname} — {server_name}", error, html.escape(error))
+            return InlineAnswer([result], INLINE_ERROR_CACHE_TIME)
+
+        level = data.get("level", {})
+        level = level.get("level", 0) if isinstance(level, dict) else level
+        result = article(
+            f"stats:{nickname.lower()}:{server_id}",
+            f"📊 {nickname} — {server_name}",
+            f"Уровень {level}, отыграно часов: {data.get('hours_played', 0)}",
+            arizona_api.format_stats(data, nickname, server_id),
+        )
+        return InlineAnswer([result], INLINE_CACHE_TIME)
+
+    def format(self) -> str:
+        return (f"Inline-запросов: {self.answered}, отменено при наборе: {self.superseded}, "
+                f"отклонено по лимиту /stats: {self.throttled}")
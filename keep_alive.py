@@ -1,5 +1,6 @@
 from flask import Flask, request, jsonify
 from threading import Thread
+import hmac
 import os
 
 app = Flask('')
@@ -7,6 +8,10 @@ app = Flask('')
 # Глобальная переменная для хранения Discord handler
 discord_handler = None
 
+# Telegram webhook: (secret token, функция передачи апдейта в event loop бота)
+TELEGRAM_WEBHOOK_PATH = '/telegram/webhook'
+telegram_handler = None
+
 @app.route('/')
 def home():
     return "MensemBot активен и работает 24/7!"
@@ -17,6 +22,7 @@ def health():
         'status': 'healthy',
         'service': 'MensemBot',
         'telegram': True,
+        'telegram_webhook': telegram_handler is not None,
         'discord_webhook': discord_handler is not None
     })
 
@@ -58,6 +64,30 @@ def discord_interactions():
         print(f"Discord interaction error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route(TELEGRAM_WEBHOOK_PATH, methods=['POST'])
+def telegram_webhook():
+    """Telegram webhook endpoint (TELEGRAM_USE_WEBHOOK=true)"""
+    if not telegram_handler:
+        return jsonify({'error': 'Telegram webhook not configured'}), 503
+
+    secret, feed = telegram_handler
+    token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    if not hmac.compare_digest(token, secret):
+        return jsonify({'error': 'Invalid secret token'}), 403
+
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict):
+        return jsonify({'error': 'Invalid JSON data'}), 400
+
+    # Обработка идёт в event loop бота; Telegram сразу получает 200
+    feed(update)
+    return jsonify({'ok': True})
+
+def set_telegram_handler(feed, secret):
+    """Установка обработчика Telegram webhook"""
+    global telegram_handler
+    telegram_handler = (secret, feed) if feed else None
+
 def set_discord_handler(handler):
     """Установка Discord handler"""
     global discord_handler
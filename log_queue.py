@@ -0,0 +1,191 @@
+"""
+Logging that never blocks the event loop.
+
+Loggers only put records into a bounded in-memory queue (QueueHandler); a
+QueueListener thread does the console and file writes. When the writer falls
+behind and the queue is full, new records are dropped and counted instead of
+making the handler wait. A record's message and traceback are rendered before
+it is queued, so the writer thread never reads objects the event loop may
+still be changing.
+
+The log file rotates when it reaches a size limit or gets older than the
+rotation interval, whichever comes first; rotated files are gzipped by the
+writer thread and only the newest few are kept. DEBUG records are sampled
+per call site (the first one, then every N-th), so enabling DEBUG in
+production doesn't flood the queue from hot paths.
+"""
+
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_exception_formatter = logging.Formatter()
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """File handler rotating by size or age, compressing rotated files."""
+
+    def __init__(self, filename: str, max_bytes: int, interval: float, backup_count: int,
+                 compress: bool = True, encoding: str = 'utf-8'):
+        super().__init__(filename, 'a', encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        # Как TimedRotatingFileHandler: возраст файла отсчитывается от его последней записи
+        started = os.stat(filename).st_mtime if os.path.exists(filename) else time.time()
+        self.rollover_at = started + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes:
+            if self.stream is None:
+                self.stream = self._open()
+            size = len(self.format(record).encode(self.encoding or 'utf-8')) + len(self.terminator)
+            # Первая запись пустого файла записывается в любом случае, даже если больше лимита
+            if self.stream.tell() and self.stream.tell() + size > self.max_bytes:
+                return True
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            target = f"{self.baseFilename}.{time.strftime('%Y%m%d-%H%M%S')}"
+            suffix = 1
+            while os.path.exists(target) or os.path.exists(target + ".gz"):
+                target = f"{self.baseFilename}.{time.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+                suffix += 1
+            self.rotate(self.baseFilename, target)
+            self.prune()
+        self.rollover_at = time.time() + self.interval
+        self.stream = self._open()
+
+    def rotate(self, source: str, dest: str):
+        if not self.compress:
+            os.replace(source, dest)
+            return
+        with open(source, 'rb') as src, gzip.open(dest + ".gz", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def backups(self) -> List[str]:
+        """Rotated files, oldest first."""
+        directory, name = os.path.split(self.baseFilename)
+        paths = [os.path.join(directory, f) for f in os.listdir(directory or ".") if f.startswith(name + ".")]
+        return sorted(paths, key=os.path.getmtime)
+
+    def prune(self):
+        backups = self.backups()
+        for path in backups[:max(0, len(backups) - self.backup_count)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class DebugSampler(logging.Filter):
+    """Lets through the first DEBUG record of each call site, then every `rate`-th."""
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+        self._seen: Dict[Tuple[str, int], int] = {}  # (файл, строка) -> сколько было записей
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate <= 1:
+            return True
+        key = (record.pathname, record.lineno)
+        count = self._seen.get(key, 0)
+        self._seen[key] = count + 1
+        if count % self.rate:
+            self.sampled_out += 1
+            return False
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Как stdlib prepare, но без копии записи: сообщение и трейсбек собираются здесь,
+        # пока event loop не изменил аргументы, и очередь не держит кадры исключения
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class QueuedLogging:
+    """Root logger -> queue -> listener thread -> console and rotating file."""
+
+    def __init__(self, handler: DroppingQueueHandler, sampler: DebugSampler,
+                 listener: logging.handlers.QueueListener):
+        self.handler = handler
+        self.sampler = sampler
+        self.listener = listener
+
+    def stop(self):
+        """Flush everything queued so far and stop the writer thread."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def format(self) -> str:
+        return (f"Логи: в очереди {self.handler.queue.qsize()}, потеряно {self.handler.dropped}, "
+                f"DEBUG отброшено выборкой: {self.sampler.sampled_out}")
+
+
+def start(filename: Optional[str], level: int = logging.INFO, max_bytes: int = 10 * 1024 * 1024,
+          interval: float = 24 * 3600, backup_count: int = 7, debug_sample: int = 10,
+          queue_size: int = 10000) -> QueuedLogging:
+    """Route all records of the root logger through a queue and a writer thread."""
+    formatter = logging.Formatter(LOG_FORMAT)
+    outputs: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if filename:
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        outputs.append(SizedTimedRotatingFileHandler(filename, max_bytes, interval, backup_count))
+    for output in outputs:
+        output.setFormatter(formatter)
+
+    handler = DroppingQueueHandler(queue.Queue(queue_size))
+    sampler = DebugSampler(debug_sample)
+    handler.addFilter(sampler)  # до очереди: отброшенные записи её не занимают
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+        old.close()
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(handler.queue, *outputs, respect_handler_level=True)
+    listener.start()
+    return QueuedLogging(handler, sampler, listener)
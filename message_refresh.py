@@ -0,0 +1,84 @@
+"""
+Helpers for messages the bot keeps editing in place (the /servers refresh
+button, status boards).
+
+Telegram rejects an edit that doesn't change anything ("message is not
+modified") and counts it against the rate limits all the same, so the hash
+of the last rendered content is remembered per message and identical renders
+are not sent. Taps on a refresh button are debounced per message: when many
+users press it at once, only the first one does any work.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+REFRESH_DEBOUNCE = 5.0     # секунд между обновлениями одного сообщения
+MAX_TRACKED = 5000
+
+MessageKey = Tuple[int, int]  # (chat_id, message_id)
+
+
+def content_hash(text: str, markup: Optional[InlineKeyboardMarkup] = None) -> str:
+    """Digest of what an edit would put into the message."""
+    digest = hashlib.blake2b(text.encode(), digest_size=16)
+    if markup is not None:
+        digest.update(json.dumps(markup.model_dump(exclude_none=True), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class _Tracked:
+    __slots__ = ("refreshed_at", "digest")
+
+    def __init__(self):
+        self.refreshed_at = float("-inf")
+        self.digest: Optional[str] = None
+
+
+class RefreshTracker:
+    """Last refresh time and content hash of recently edited messages."""
+
+    def __init__(self, debounce: float = REFRESH_DEBOUNCE, max_tracked: int = MAX_TRACKED):
+        self.debounce = debounce
+        self.max_tracked = max_tracked
+        self.debounced = 0
+        self.unchanged = 0
+        self._messages: "OrderedDict[MessageKey, _Tracked]" = OrderedDict()
+
+    def _get(self, key: MessageKey) -> _Tracked:
+        tracked = self._messages.get(key)
+        if tracked is None:
+            tracked = self._messages[key] = _Tracked()
+            if len(self._messages) > self.max_tracked:
+                self._messages.popitem(last=False)
+        else:
+            self._messages.move_to_end(key)
+        return tracked
+
+    def try_refresh(self, chat_id: int, message_id: int, now: Optional[float] = None) -> bool:
+        """True if the message may be refreshed now; marks it as refreshing."""
+        now = time.monotonic() if now is None else now
+        tracked = self._get((chat_id, message_id))
+        if now - tracked.refreshed_at < self.debounce:
+            self.debounced += 1
+            return False
+        tracked.refreshed_at = now  # до запроса данных: параллельные нажатия уже отсекаются
+        return True
+
+    def remember(self, chat_id: int, message_id: int, digest: str):
+        """Record the content a message was sent or edited with."""
+        self._get((chat_id, message_id)).digest = digest
+
+    def changed(self, chat_id: int, message_id: int, digest: str) -> bool:
+        """True if `digest` differs from what the message shows (unknown counts as changed)."""
+        if self._get((chat_id, message_id)).digest == digest:
+            self.unchanged += 1
+            return False
+        return True
+
+    def format(self) -> str:
+        return f"Обновлений без изменений: {self.unchanged}, отсечено повторных нажатий: {self.debounced}"
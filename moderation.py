@@ -0,0 +1,239 @@
+"""
+Banned-word and repeated-spam moderation for the Telegram dispatcher.
+Runs as an outer middleware, i.e. before command routing and filters.
+"""
+
+import asyncio
+import html
+import logging
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message
+
+from deletion_scheduler import DeletionScheduler
+from duplicates import DuplicateIndex
+from filters import PermissionSet
+from word_matcher import BannedWordMatcher
+
+logger = logging.getLogger(__name__)
+
+WARNING_TTL = 30       # секунд до удаления предупреждения
+WARNING_WINDOW = 60    # не больше одного предупреждения пользователю за это время
+REPORT_INTERVAL = 60   # сводка для создателя раз в минуту, а не ЛС на каждое удаление
+REPORT_MAX_CHATS = 20
+REPORT_MAX_USERS = 10  # пользователей на чат в одной сводке
+
+
+class ModerationStats:
+    """Per-message cost of the moderation check."""
+
+    def __init__(self, window: int = 1024):
+        self.checked = 0
+        self.skipped = 0
+        self.violations = 0
+        self.duplicates = 0  # из них — повторяющийся спам
+        self.total_ns = 0
+        self.max_ns = 0
+        self._recent = deque(maxlen=window)  # последние замеры для перцентилей
+
+    def record(self, elapsed_ns: int, violation: bool):
+        self.checked += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        if violation:
+            self.violations += 1
+        self._recent.append(elapsed_ns)
+
+    def percentile(self, p: float) -> float:
+        """Percentile of recent check times in microseconds."""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] / 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        avg_us = self.total_ns / self.checked / 1000 if self.checked else 0.0
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "violations": self.violations,
+            "duplicates": self.duplicates,
+            "avg_us": round(avg_us, 1),
+            "p99_us": round(self.percentile(0.99), 1),
+            "max_us": round(self.max_ns / 1000, 1),
+        }
+
+    def format(self) -> str:
+        s = self.as_dict()
+        return (
+            f"Проверено сообщений: {s['checked']} (пропущено: {s['skipped']})\n"
+            f"Нарушений: {s['violations']} (спам-повторов: {s['duplicates']})\n"
+            f"Время проверки: ср. {s['avg_us']} мкс, p99 {s['p99_us']} мкс, макс. {s['max_us']} мкс"
+        )
+
+
+class _ChatReport:
+    __slots__ = ("title", "reasons", "users")
+
+    def __init__(self, title: Optional[str]):
+        self.title = title
+        self.reasons: Counter = Counter()
+        self.users: Dict[int, str] = {}
+
+
+class ModerationReporter:
+    """Aggregates moderation actions into one creator report per interval."""
+
+    def __init__(self, notify: Callable[[str], Awaitable[Any]], interval: float = REPORT_INTERVAL):
+        self.notify = notify
+        self.interval = interval
+        self._chats: Dict[int, _ChatReport] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, message: Message, reason: str):
+        report = self._chats.get(message.chat.id)
+        if report is None:
+            report = self._chats[message.chat.id] = _ChatReport(message.chat.title)
+        report.reasons[reason] += 1
+        user = message.from_user
+        if user is not None and user.id not in report.users:
+            report.users[user.id] = user.mention_html()
+
+    def format(self) -> Optional[str]:
+        """Report text for everything collected so far, or None if nothing happened."""
+        if not self._chats:
+            return None
+        total = sum(sum(r.reasons.values()) for r in self._chats.values())
+        lines = [f"🚫 Модерация: удалено сообщений — {total}"]
+        for chat_id, report in list(self._chats.items())[:REPORT_MAX_CHATS]:
+            lines.append(f"\n<b>{html.escape(report.title or '')}</b> (ID: {chat_id})")
+            lines.extend(f"• {reason}: {count}" for reason, count in report.reasons.most_common())
+            users = [f"{mention} (ID: {uid})" for uid, mention in list(report.users.items())[:REPORT_MAX_USERS]]
+            if len(report.users) > REPORT_MAX_USERS:
+                users.append(f"и ещё {len(report.users) - REPORT_MAX_USERS}")
+            lines.append("Пользователи: " + ", ".join(users))
+        if len(self._chats) > REPORT_MAX_CHATS:
+            lines.append(f"\n…и ещё чатов: {len(self._chats) - REPORT_MAX_CHATS}")
+        return "\n".join(lines)
+
+    async def flush(self):
+        text = self.format()
+        self._chats = {}
+        if text:
+            await self.notify(text)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to send moderation report: {e}")
+
+
+class ModerationMiddleware(BaseMiddleware):
+    """Deletes group messages containing banned words before any handler runs."""
+
+    def __init__(
+        self,
+        matcher: BannedWordMatcher,
+        permissions: PermissionSet,
+        scheduler: DeletionScheduler,
+        reporter: Optional[ModerationReporter] = None,
+        duplicates: Optional[DuplicateIndex] = None,
+    ):
+        self.matcher = matcher
+        self.permissions = permissions
+        self.scheduler = scheduler
+        self.reporter = reporter
+        self.duplicates = duplicates
+        self.stats = ModerationStats()
+        # (chat_id, user_id) -> время последнего предупреждения, в порядке выдачи
+        self._warned: "OrderedDict[Tuple[int, int], float]" = OrderedDict()
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        # Быстрый выход: нет текста, личка или сообщение от админа
+        text = event.text or event.caption
+        if not text or event.chat.type == "private" or event.from_user is None \
+                or self.permissions.is_admin(event.from_user.id):
+            self.stats.skipped += 1
+            return await handler(event, data)
+
+        started = time.perf_counter_ns()
+        match = self.matcher.search(text, event.chat.id)
+        duplicate = None
+        if match is None and self.duplicates is not None:
+            duplicate = self.duplicates.add(text, event.chat.id, event.from_user.id)
+        self.stats.record(time.perf_counter_ns() - started, match is not None or duplicate is not None)
+
+        if match is not None:
+            await self.punish(
+                event, "из-за использования запрещенного слова", "Запрещенное слово",
+                f"banned word '{match.word}' (as '{match.fragment}')"
+            )
+        elif duplicate is not None:
+            self.stats.duplicates += 1
+            await self.punish(
+                event, "как повторяющийся спам", "Спам (повтор сообщения)",
+                f"spam: {duplicate.copies} similar message(s) in {duplicate.chats} chat(s)"
+            )
+        else:
+            return await handler(event, data)
+        return None  # сообщение удалено — дальше по роутерам не идём
+
+    def should_warn(self, chat_id: int, user_id: int, now: Optional[float] = None) -> bool:
+        """At most one warning per user per WARNING_WINDOW; expired entries are dropped."""
+        now = time.monotonic() if now is None else now
+        warned = self._warned
+        while warned:
+            key, warned_at = next(iter(warned.items()))
+            if now - warned_at < WARNING_WINDOW:
+                break
+            del warned[key]
+        key = (chat_id, user_id)
+        if key in warned:
+            return False
+        warned[key] = now
+        return True
+
+    async def punish(self, message: Message, warning_reason: str, report_reason: str, log_detail: str):
+        user = message.from_user
+        # Удаление уходит в планировщик: во время рейда сообщения одного тика
+        # удаляются одним deleteMessages
+        self.scheduler.schedule(message.chat.id, message.message_id, 0)
+        if self.reporter:
+            self.reporter.add(message, report_reason)
+        logger.info(f"Deleted message from user {user.id}, {log_detail}. Chat ID: {message.chat.id}")
+
+        if not self.should_warn(message.chat.id, user.id):
+            return
+        try:
+            warning = await message.answer(
+                f"Сообщение от {user.mention_html()} удалено {warning_reason}."
+            )
+            self.scheduler.schedule(warning.chat.id, warning.message_id, WARNING_TTL)
+        except Exception as e:
+            logger.error(f"Failed to send moderation warning: {e}")
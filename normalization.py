@@ -0,0 +1,135 @@
+"""
+Text normalization for evasion-resistant banned-word matching.
+
+Pipeline (same for banned words and messages):
+  1. case + homoglyph + digit folding  — one precomputed 1:1 str.translate table
+  2. separator stripping               — punctuation / zero-width chars removed
+  3. run-length collapsing             — "казииино" -> "казино", "  " -> " "
+
+Steps 2 and 3 run in C (str.replace / re.sub), so the whole thing is linear in
+the message length. The mapping back to original offsets is only built when a
+match actually needs it.
+"""
+
+import operator
+import re
+from typing import List, Optional, Tuple
+
+SEPARATOR = "\x00"  # промежуточная метка для удаляемых символов
+
+# Latin lookalikes folded to Cyrillic. Upper and lower case map to the same
+# letter, so a word matches regardless of how it was typed.
+HOMOGLYPHS = {
+    "a": "а", "b": "в", "c": "с", "e": "е", "h": "н", "k": "к", "m": "м", "n": "п",
+    "o": "о", "p": "р", "r": "г", "t": "т", "u": "и", "x": "х", "y": "у",
+    "A": "а", "B": "в", "C": "с", "E": "е", "H": "н", "K": "к", "M": "м", "N": "п",
+    "O": "о", "P": "р", "R": "г", "T": "т", "U": "и", "X": "х", "Y": "у",
+    "ё": "е", "Ё": "е",
+}
+
+# Leetspeak digits and symbols
+LEET = {
+    "0": "о", "1": "i", "3": "з", "4": "ч", "6": "б", "8": "в", "@": "а", "$": "s",
+}
+
+SEPARATORS = (
+    ".,-_*'\"`~!?;:/\\|()[]{}<>^+=#%&…–—«»„“”‘’•·"
+    "­​‌‍⁠﻿"  # soft hyphen и zero-width символы
+)
+
+# Все символы, для которых str.isspace() истинно: каждый становится обычным
+# пробелом, strip() ниже убирает только " ", как и _build_offsets.
+# Списком, а не перебором 65536 символов при импорте.
+WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+
+
+def _build_fold_table() -> str:
+    table = {}
+    # Регистр: ASCII и кириллица (остальные символы не трогаем, чтобы сохранить длину)
+    for ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZАБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ":
+        table[ord(ch)] = ch.lower()
+    for src, dst in {**HOMOGLYPHS, **LEET}.items():
+        table[ord(src)] = dst
+    for ch in SEPARATORS + SEPARATOR:
+        table[ord(ch)] = SEPARATOR
+    for ch in WHITESPACE:
+        table[ord(ch)] = " "
+    # Таблица строго 1:1, иначе смещения перестанут совпадать
+    assert all(len(v) == 1 for v in table.values())
+    # Строка-таблица вместо dict: str.translate индексирует её быстрее;
+    # символы за её концом (IndexError) остаются как есть
+    chars = list(map(chr, range(max(table) + 1)))
+    for code, ch in table.items():
+        chars[code] = ch
+    return "".join(chars)
+
+
+FOLD_TABLE = _build_fold_table()
+_RUNS = re.compile(r"(.)\1+", re.DOTALL)
+_FIRST = operator.methodcaller("group", 1)  # быстрее шаблона r"\1" в re.sub
+
+
+def _collapse(folded: str) -> str:
+    return _RUNS.sub(_FIRST, folded.replace(SEPARATOR, ""))
+
+
+def fold(text: str) -> str:
+    """Normalized fragment without trimming (for literal parts of glob patterns)."""
+    return _collapse(text.translate(FOLD_TABLE))
+
+
+class NormalizedText:
+    """Normalized form of a message plus a lazy map back to the original offsets."""
+
+    __slots__ = ("original", "text", "_folded", "_starts", "_ends")
+
+    def __init__(self, original: str):
+        self.original = original
+        self._folded = original.translate(FOLD_TABLE)
+        self.text = _collapse(self._folded).strip(" ")
+        self._starts: Optional[List[int]] = None
+        self._ends: Optional[List[int]] = None
+
+    def _build_offsets(self):
+        """Replays steps 2-3 in Python, recording where each output char came from."""
+        starts: List[int] = []
+        ends: List[int] = []
+        last = None
+        for i, ch in enumerate(self._folded):
+            if ch == SEPARATOR:
+                continue
+            if ch == last:
+                ends[-1] = i  # символ вошёл в уже схлопнутую серию
+                continue
+            starts.append(i)
+            ends.append(i)
+            last = ch
+        # strip(" ") убрал пробел в начале/конце
+        if starts and self._folded[starts[0]] == " ":
+            del starts[0], ends[0]
+        if starts and self._folded[starts[-1]] == " ":
+            del starts[-1], ends[-1]
+        self._starts, self._ends = starts, ends
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Original [start, end) covering normalized text[start:end]."""
+        if self._starts is None:
+            self._build_offsets()
+        return self._starts[start], self._ends[end - 1] + 1
+
+    def original_fragment(self, start: int, end: int) -> str:
+        orig_start, orig_end = self.span(start, end)
+        return self.original[orig_start:orig_end]
+
+
+def normalize(text: str) -> NormalizedText:
+    return NormalizedText(text)
+
+
+def normalize_word(word: str) -> str:
+    """Normalized form of a banned word (matches normalize(text).text)."""
+    return NormalizedText(word).text
@@ -0,0 +1,169 @@
+"""
+Rate-aware outbound requests for the Telegram bot.
+
+A request middleware on the bot session, so every send/edit made anywhere
+(handlers, moderation, reports) passes through it without call-site changes.
+Messages wait for a token in the global bucket (~30/s) and in the bucket of
+their chat (20/min in groups, 1/s in private chats) instead of running into
+429s. While a message waits, its handler gives back its concurrency slot
+(see concurrency.released_slot), so a flood of replies into one group
+doesn't get other chats' commands shed as "busy". Notifications (reports to
+the creator, status updates) go in a lower lane: they only take a global
+token when no reply is waiting. A RetryAfter that still happens blocks that
+chat's bucket for the requested time and the request is retried.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from concurrency import released_slot
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE = 30.0            # сообщений в секунду на бота
+GLOBAL_BURST = 30
+GROUP_RATE = 20 / 60          # 20 сообщений в минуту в группе
+GROUP_BURST = 5               # запас, дальше раз в 3 секунды
+PRIVATE_RATE = 1.0            # около сообщения в секунду в личке
+PRIVATE_BURST = 3
+MAX_RETRIES = 3
+MAX_TRACKED_CHATS = 10000
+# Остальные методы (delete, answer...) идут без очереди
+LIMITED_PREFIXES = ("send", "edit", "copy", "forward")
+
+REPLY = 0          # ответы на команды и сообщения
+NOTIFICATION = 1   # сводки и статусы, могут подождать
+
+_lane: contextvars.ContextVar[int] = contextvars.ContextVar("telegram_lane", default=REPLY)
+
+
+@contextmanager
+def notification_lane():
+    """Requests made inside the block go in the low-priority lane."""
+    token = _lane.set(NOTIFICATION)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class TokenBucket:
+    """Token bucket kept as the time it becomes full again (one float per chat)."""
+
+    __slots__ = ("rate", "burst", "full_at")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.full_at = 0.0
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token is available."""
+        # Сколько токенов не хватает до полного ведра
+        missing = (self.full_at - now) * self.rate
+        return max(0.0, (missing - self.burst + 1) / self.rate)
+
+    def take(self, now: float):
+        self.full_at = max(self.full_at, now) + 1 / self.rate
+
+    def block(self, now: float, seconds: float):
+        """Empty the bucket for `seconds` (after RetryAfter)."""
+        self.full_at = max(self.full_at, now + seconds + self.burst / self.rate)
+
+
+class OutboundLimiter(BaseRequestMiddleware):
+    """Global and per-chat token buckets with priority lanes for outgoing messages."""
+
+    def __init__(self, global_rate: float = GLOBAL_RATE, global_burst: int = GLOBAL_BURST,
+                 max_retries: int = MAX_RETRIES):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.max_retries = max_retries
+        self._chats: "OrderedDict[Union[int, str], TokenBucket]" = OrderedDict()
+        self._waiting = [0, 0]   # ожидающих запросов по полосам
+        self.sent = 0
+        self.delayed = 0
+        self.retried = 0
+
+    def chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            private = isinstance(chat_id, int) and chat_id > 0
+            bucket = self._chats[chat_id] = TokenBucket(
+                PRIVATE_RATE if private else GROUP_RATE, PRIVATE_BURST if private else GROUP_BURST
+            )
+            if len(self._chats) > MAX_TRACKED_CHATS:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _wait_time(self, chat: Optional[TokenBucket], lane: int, now: float) -> float:
+        wait = self.global_bucket.delay(now)
+        if chat is not None:
+            wait = max(wait, chat.delay(now))
+        if not wait and lane == NOTIFICATION and self._waiting[REPLY]:
+            wait = 1 / self.global_bucket.rate  # уступаем ответам
+        return wait
+
+    async def acquire(self, chat_id: Optional[Union[int, str]], lane: int):
+        chat = self.chat_bucket(chat_id) if chat_id is not None else None
+        now = time.monotonic()
+        wait = self._wait_time(chat, lane, now)
+        if wait:
+            self.delayed += 1
+            self._waiting[lane] += 1
+            try:
+                while wait:
+                    async with released_slot():
+                        while wait:
+                            await asyncio.sleep(wait)
+                            wait = self._wait_time(chat, lane, time.monotonic())
+                    # Токен мог уйти другому запросу
+                    now = time.monotonic()
+                    wait = self._wait_time(chat, lane, now)
+            finally:
+                self._waiting[lane] -= 1
+        self.global_bucket.take(now)
+        if chat is not None:
+            chat.take(now)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not method.__api_method__.lower().startswith(LIMITED_PREFIXES):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        lane = _lane.get()
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(chat_id, lane)
+            try:
+                response = await make_request(bot, method)
+                self.sent += 1
+                return response
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retried += 1
+                logger.warning(f"Telegram asked to retry {method.__api_method__} in chat {chat_id} "
+                               f"after {e.retry_after}s")
+                bucket = self.chat_bucket(chat_id) if chat_id is not None else self.global_bucket
+                bucket.block(time.monotonic(), e.retry_after)
+
+    def format(self) -> str:
+        return (f"Отправлено: {self.sent}, ждали очереди: {self.delayed}, "
+                f"повторов после 429: {self.retried}")
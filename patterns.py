@@ -0,0 +1,370 @@
+"""
+Banned-word pattern syntax.
+
+  казино      plain word, substring of the normalized message
+  казин*      glob, whole word: * = any letters, ? = exactly one letter
+  re:\\bкот\\b  regular expression over the original text (case-insensitive)
+
+Globs are matched against normalized text (see normalization.py), regexes
+against the message as sent. Every pattern passes a complexity guard before
+it can reach the hot path, so one bad entry can't cause catastrophic
+backtracking. Besides nesting, the guard rejects variable-length repeats
+that can match the same characters one after another (\\w*\\w*, .*a.*,
+a{1,9}a{1,9}): the engine would try every way of splitting the text between
+them, which is polynomial in the message length.
+
+Unbounded repeats (*, +, {m,}) match at most MAX_UNBOUNDED_SPAN characters,
+so every compiled pattern has a known maximum width (max_width). Long
+messages are searched in windows that overlap by that width, and no match
+is lost at a window boundary.
+"""
+
+import re
+from typing import FrozenSet, List, Optional, Tuple
+
+from normalization import fold
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+    import re._constants as sre_constants
+except ImportError:  # pragma: no cover
+    import sre_parse
+    import sre_constants
+
+REGEX_PREFIX = "re:"
+WILDCARDS = "*?"
+
+MAX_PATTERN_LENGTH = 200
+MAX_REPEAT_COUNT = 100      # верхняя граница {m,n}
+MAX_UNBOUNDED_REPEATS = 2   # *, +, {m,} на один шаблон
+MAX_REPEAT_TOTAL = 200      # сумма верхних границ всех {m,n} шаблона
+MAX_UNBOUNDED_SPAN = 100    # сколько символов поглощают *, + и {m,} при поиске
+
+PLAIN = "plain"
+GLOB = "glob"
+REGEX = "regex"
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+
+class PatternError(ValueError):
+    """Pattern is malformed or too expensive to match."""
+
+
+def pattern_kind(pattern: str) -> str:
+    if pattern.startswith(REGEX_PREFIX):
+        return REGEX
+    if any(ch in pattern for ch in WILDCARDS):
+        return GLOB
+    return PLAIN
+
+
+def canonical_pattern(pattern: str) -> str:
+    """Stored form: lowercase, except regexes where case matters (\\w vs \\W)."""
+    pattern = pattern.strip()
+    if pattern_kind(pattern) == REGEX:
+        return pattern
+    return pattern.lower()
+
+
+# -----------------------------
+# Globs
+# -----------------------------
+def glob_to_regex(pattern: str) -> str:
+    """Regex source for a glob, literal parts normalized like the message text."""
+    parts: List[str] = []
+    unbounded = 0
+    for chunk in re.split(r"([*?]+)", pattern):
+        if not chunk:
+            continue
+        if chunk[0] in WILDCARDS:
+            # Соседние * и ? схлопываются в один квантификатор: "?*" -> \w{1,}
+            exact = chunk.count("?")
+            if "*" in chunk:
+                unbounded += 1
+                parts.append(rf"\w{{{exact},{max(exact, MAX_UNBOUNDED_SPAN)}}}")
+            else:
+                parts.append(rf"\w{{{exact}}}")
+        else:
+            parts.append(re.escape(fold(chunk)))
+
+    if unbounded > MAX_UNBOUNDED_REPEATS:
+        raise PatternError(f"не больше {MAX_UNBOUNDED_REPEATS} символов * в шаблоне")
+    if not any(p and not p.startswith(r"\w") for p in parts):
+        raise PatternError("шаблон должен содержать хотя бы одну букву")
+    return r"(?<!\w)" + "".join(parts) + r"(?!\w)"
+
+
+# -----------------------------
+# Regexes
+# -----------------------------
+# Символы, по которым проверяется, пересекаются ли соседние повторения
+_SAMPLE = (
+    "".join(chr(code) for code in range(0x20, 0x7f)) + "\t\n\r\x0b\x0c"
+    + "".join(chr(code) for code in range(0x400, 0x460)) + "\u00a0\u2028\u3000éßµ²٣😀"
+)
+_ALL = frozenset(_SAMPLE)
+_NONE: FrozenSet[str] = frozenset()
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r"\d", sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+    sre_constants.CATEGORY_SPACE: r"\s", sre_constants.CATEGORY_NOT_SPACE: r"\S",
+    sre_constants.CATEGORY_WORD: r"\w", sre_constants.CATEGORY_NOT_WORD: r"\W",
+}
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", None)
+
+
+def _class_item(op, av) -> str:
+    if op is sre_constants.LITERAL:
+        return re.escape(chr(av))
+    if op is sre_constants.RANGE:
+        return f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}"
+    if op is sre_constants.CATEGORY:
+        return _CATEGORIES[av]
+    if op is sre_constants.NEGATE:
+        return "^"
+    raise PatternError("неподдерживаемый элемент класса символов")
+
+
+def _atom_chars(op, av) -> FrozenSet[str]:
+    """Sample characters one character atom matches (case-insensitive, like the search)."""
+    if op is sre_constants.LITERAL:
+        source = re.escape(chr(av))
+    elif op is sre_constants.NOT_LITERAL:
+        source = f"[^{re.escape(chr(av))}]"
+    elif op is sre_constants.ANY:
+        source = "."
+    else:  # IN
+        source = "[" + "".join(_class_item(item_op, item_av) for item_op, item_av in av) + "]"
+    atom = re.compile(source, re.IGNORECASE)
+    chars = frozenset(ch for ch in _SAMPLE if atom.fullmatch(ch))
+    # Класс вне выборки (например, иероглифы) считаем пересекающимся со всем
+    return chars or _ALL
+
+
+def _chars(subpattern) -> FrozenSet[str]:
+    """Everything any character atom of the subpattern can match."""
+    chars = _NONE
+    for op, av in subpattern:
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN):
+            chars |= _atom_chars(op, av)
+        elif op in _REPEATS:
+            chars |= _chars(av[2])
+        elif op is sre_constants.SUBPATTERN:
+            chars |= _chars(av[-1])
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                chars |= _chars(branch)
+        elif op is _ATOMIC_GROUP:
+            chars |= _chars(av)
+    return chars
+
+
+def _variable(subpattern) -> bool:
+    """True if the subpattern contains a repeat of variable length."""
+    for op, av in subpattern:
+        if op in _REPEATS and av[0] != av[1]:
+            return True
+        if op is sre_constants.SUBPATTERN and _variable(av[-1]):
+            return True
+        if op is sre_constants.BRANCH and any(_variable(branch) for branch in av[1]):
+            return True
+        if op is _ATOMIC_GROUP and _variable(av):
+            return True
+    return False
+
+
+def _check_regex(subpattern, in_repeat: bool, state: dict):
+    # Символы, которые ещё может поглотить предыдущее повторение переменной длины:
+    # следующее повторение не должно их разделять, пока их не "закроет" обязательный
+    # символ, которого среди них нет
+    pending = _NONE
+    for op, av in subpattern:
+        if op in _REPEATS:
+            low, high, inner = av
+            if in_repeat:
+                raise PatternError("вложенные повторения запрещены")
+            if high == sre_constants.MAXREPEAT:
+                state["unbounded"] += 1
+                if state["unbounded"] > MAX_UNBOUNDED_REPEATS:
+                    raise PatternError(f"не больше {MAX_UNBOUNDED_REPEATS} неограниченных повторений")
+            elif high > MAX_REPEAT_COUNT:
+                raise PatternError(f"повторение больше {MAX_REPEAT_COUNT} раз")
+            else:
+                state["bounded"] += high
+                if state["bounded"] > MAX_REPEAT_TOTAL:
+                    raise PatternError(f"сумма повторений {{m,n}} больше {MAX_REPEAT_TOTAL}")
+            _check_regex(inner, True, state)
+            chars = _chars(inner)
+            if low != high:
+                if pending & chars:
+                    raise PatternError("соседние повторения совпадают с одними и теми же символами")
+                # Обязательная часть (a+) сама закрывает предыдущее повторение
+                pending = chars if low else pending | chars
+            elif low and not pending & chars:
+                pending = _NONE
+        elif op is sre_constants.BRANCH:
+            if in_repeat:
+                raise PatternError("альтернатива внутри повторения запрещена")
+            for branch in av[1]:
+                _check_regex(branch, in_repeat, state)
+            pending = _group_pending(av[1], pending)
+        elif op is sre_constants.SUBPATTERN:
+            _check_regex(av[-1], in_repeat, state)
+            pending = _group_pending([av[-1]], pending)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            direction, inner = av
+            if direction < 0:
+                raise PatternError("lookbehind не поддерживается")
+            _check_regex(inner, in_repeat, state)
+        elif op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            raise PatternError("обратные ссылки не поддерживаются")
+        elif op is _ATOMIC_GROUP:
+            _check_regex(av, in_repeat, state)
+            pending = _group_pending([av], pending)
+        elif op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN):
+            if not pending & _atom_chars(op, av):
+                pending = _NONE
+
+
+def _group_pending(branches, pending: FrozenSet[str]) -> FrozenSet[str]:
+    """A group as one element of the enclosing sequence (see _check_regex)."""
+    chars = _NONE
+    for branch in branches:
+        chars |= _chars(branch)
+    if any(_variable(branch) for branch in branches):
+        if pending & chars:
+            raise PatternError("соседние повторения совпадают с одними и теми же символами")
+        return pending | chars
+    return pending if pending & chars else _NONE
+
+
+def _cap_unbounded(source: str, span: int = MAX_UNBOUNDED_SPAN) -> str:
+    """The same regex with *, + and {m,} rewritten as {0,span}, {1,span} and {m,span}."""
+    out: List[str] = []
+    i, n = 0, len(source)
+    quantified = False  # предыдущий токен — квантификатор: следующие ? и + его модификаторы
+    while i < n:
+        ch = source[i]
+        if ch == "\\":
+            out.append(source[i:i + 2])
+            i += 2
+            quantified = False
+            continue
+        if ch == "[":
+            # Класс символов копируется как есть; ^ и ] в начале — часть класса
+            end = i + 1
+            if end < n and source[end] == "^":
+                end += 1
+            if end < n and source[end] == "]":
+                end += 1
+            while end < n and source[end] != "]":
+                end += 2 if source[end] == "\\" else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+            quantified = False
+            continue
+        if ch in "?+" and quantified:
+            out.append(ch)  # ленивый или possessive модификатор
+            quantified = False
+        elif ch == "(" and source.startswith("(?", i):
+            out.append("(?")
+            i += 1
+            quantified = False
+        elif ch in "*+":
+            out.append(f"{{{0 if ch == '*' else 1},{span}}}")
+            quantified = True
+        elif ch == "?":
+            out.append(ch)
+            quantified = True
+        elif ch == "{" and re.match(r"\{\d*(,\d*)?\}", source[i:]):
+            quantifier = re.match(r"\{(\d*)(,?)(\d*)\}", source[i:])
+            low, comma, high = quantifier.groups()
+            if comma and not high:
+                out.append(f"{{{low},{max(int(low or 0), span)}}}")
+            else:
+                out.append(quantifier.group())
+            i += quantifier.end() - 1
+            quantified = True
+        else:
+            out.append(ch)
+            quantified = False
+        i += 1
+    return "".join(out)
+
+
+def _max_width(subpattern) -> int:
+    """Upper bound on how far past its start a match can read (lookaheads included)."""
+    width = 0
+    for op, av in subpattern:
+        if op in _REPEATS:
+            width += av[1] * _max_width(av[2])
+        elif op is sre_constants.BRANCH:
+            width += max(_max_width(branch) for branch in av[1])
+        elif op is sre_constants.SUBPATTERN:
+            width += _max_width(av[-1])
+        elif op is _ATOMIC_GROUP:
+            width += _max_width(av)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            width += _max_width(av[1])  # заглядывание вперёд читает символы, не поглощая их
+        elif op is sre_constants.AT:
+            width += 1  # \b и $ смотрят на следующий символ
+        else:
+            width += 1
+    return width
+
+
+def max_width(source: str) -> int:
+    """How many characters past its start a (capped) regex source can examine."""
+    return _max_width(sre_parse.parse(source))
+
+
+def regex_source(pattern: str) -> str:
+    """Validated regex source of a `re:` pattern, unbounded repeats capped."""
+    source = pattern[len(REGEX_PREFIX):]
+    if not source:
+        raise PatternError("пустое регулярное выражение")
+    try:
+        parsed = sre_parse.parse(source)
+    except re.error as e:
+        raise PatternError(f"ошибка в регулярном выражении: {e}")
+    if parsed.state.flags & ~sre_constants.SRE_FLAG_UNICODE:
+        raise PatternError("флаги (?...) не поддерживаются, поиск и так без учёта регистра")
+    if parsed.state.groupdict:
+        raise PatternError("именованные группы не поддерживаются")
+    _check_regex(parsed, False, {"unbounded": 0, "bounded": 0})
+    if re.match(source, ""):
+        raise PatternError("выражение совпадает с пустой строкой")
+    return _cap_unbounded(source)
+
+
+# -----------------------------
+# Entry points
+# -----------------------------
+def validate_pattern(pattern: str) -> str:
+    """Canonical form of an admin-supplied pattern; raises PatternError if unusable."""
+    pattern = canonical_pattern(pattern)
+    if not pattern:
+        raise PatternError("пустой шаблон")
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise PatternError(f"шаблон длиннее {MAX_PATTERN_LENGTH} символов")
+    kind = pattern_kind(pattern)
+    if kind == GLOB:
+        glob_to_regex(pattern)
+    elif kind == REGEX:
+        regex_source(pattern)
+    elif not fold(pattern).strip():
+        raise PatternError("слово состоит только из знаков препинания")
+    return pattern
+
+
+def combine(sources: List[Tuple[str, str]], flags: int = 0) -> Optional[re.Pattern]:
+    """One alternation of (pattern, regex source) pairs; the group name maps back via lastgroup."""
+    if not sources:
+        return None
+    return re.compile(
+        "|".join(f"(?P<p{i}>{source})" for i, (_, source) in enumerate(sources)),
+        flags,
+    )
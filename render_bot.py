@@ -5,7 +5,6 @@ Render.com entry point для MensemBot
 """
 
 import os
-import asyncio
 import threading
 import time
 from flask import Flask
@@ -13,12 +12,14 @@ from keep_alive import app, keep_alive
 
 # Импорт основного бота
 from unified_bot import main as bot_main
+import event_loop
 
 def run_bot_async():
     """Запуск бота в отдельном потоке"""
     def run_bot():
         try:
-            asyncio.run(bot_main())
+            # Свой цикл у потока, того же типа, что и в остальных точках входа
+            event_loop.run(bot_main())
         except Exception as e:
             print(f"❌ Ошибка бота: {e}")
             # Перезапуск бота после ошибки
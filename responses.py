@@ -0,0 +1,91 @@
+"""
+Prerendered responses for static commands (/rules, /info, /rank).
+
+Each response is rendered once per platform and scope - Telegram HTML per
+chat, a Discord interaction response dict - and served from memory. The cache
+subscribes to DataManager changes, so a /setrules drops exactly the entries
+it affects and the next request renders them again. Cached Discord dicts are
+shared: callers must serialize them, not modify them.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import CHAT_CACHE_SIZE
+from data_manager import DataChange, DataManager, INFO, RANK, RULES
+from unified_config import RANK_MESSAGE
+
+TELEGRAM = "telegram"
+DISCORD = "discord"
+
+STATIC_KEYS = (RULES, INFO, RANK)
+
+_TELEGRAM_FORMATS: Dict[str, Callable[[str], str]] = {
+    RULES: lambda rules: f"📋 <b>Правила чата:</b>\n\n{rules}",
+    INFO: lambda info: f"ℹ️ <b>Информация:</b>\n\n{info}",
+    RANK: lambda rank: rank or RANK_MESSAGE,
+}
+
+# title, color
+_DISCORD_EMBEDS: Dict[str, Tuple[str, int]] = {
+    RULES: ('📋 Правила сервера', 0x0099ff),
+    INFO: ('ℹ️ Информация', 0x00ff99),
+    RANK: ('🏆 Ранги', 0xffd700),
+}
+
+
+def discord_embed_response(title: str, description: str, color: int) -> Dict[str, Any]:
+    """Interaction response (type 4) with one embed."""
+    return {'type': 4, 'data': {'embeds': [{'title': title, 'description': description, 'color': color}]}}
+
+
+class ResponseCache:
+    """Rendered static responses keyed by (key, platform, chat_id)."""
+
+    def __init__(self, data_manager: DataManager, max_entries: int = CHAT_CACHE_SIZE * len(STATIC_KEYS)):
+        self.data_manager = data_manager
+        self.max_entries = max_entries
+        self.hits = 0
+        self.renders = 0
+        self._cache: "OrderedDict[Tuple[str, str, Optional[int]], Any]" = OrderedDict()
+        data_manager.subscribe(self._on_change, *STATIC_KEYS)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _on_change(self, event: DataChange):
+        if event.chat_id is None:
+            # Глобальное значение видят все чаты без своего — сбрасываем ключ целиком
+            stale = [k for k in self._cache if k[0] == event.key]
+        else:
+            stale = [k for k in self._cache if k[0] == event.key and k[2] == event.chat_id]
+        for k in stale:
+            del self._cache[k]
+
+    def _get(self, key: str, platform: str, chat_id: Optional[int]) -> Any:
+        cache_key = (key, platform, chat_id)
+        rendered = self._cache.get(cache_key)
+        if rendered is not None:
+            self._cache.move_to_end(cache_key)
+            self.hits += 1
+            return rendered
+
+        value = getattr(self.data_manager, f"get_{key}")(chat_id)
+        if platform == TELEGRAM:
+            rendered = _TELEGRAM_FORMATS[key](value)
+        else:
+            title, color = _DISCORD_EMBEDS[key]
+            rendered = discord_embed_response(title, value, color)
+        self.renders += 1
+        self._cache[cache_key] = rendered
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return rendered
+
+    def telegram(self, key: str, chat_id: Optional[int] = None) -> str:
+        """HTML text for a Telegram chat (None = private chats / global scope)."""
+        return self._get(key, TELEGRAM, chat_id)
+
+    def discord(self, key: str) -> Dict[str, Any]:
+        """Interaction response for Discord (global scope only)."""
+        return self._get(key, DISCORD, None)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Startup-time report: how long importing the bot takes and which modules cost
+the most, from `python -X importtime` in a fresh interpreter.
+
+The bot is imported the way Render starts it: DISCORD_TOKEN is removed from
+the environment unless --with-discord is given, so platform modules that are
+loaded only when configured stay out of the measurement.
+
+    python scripts/import_report.py
+    python scripts/import_report.py --module bot --runs 5 --top 25 --budget 1.0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print('WALL', time.perf_counter() - started)"
+)
+
+
+def measure(module: str, with_discord: bool) -> Tuple[float, List[Tuple[int, int, int, str]]]:
+    """One cold interpreter: wall time of the import and (depth, self_us, cumulative_us, name) rows."""
+    env = dict(os.environ)
+    env.setdefault("BOT_TOKEN", "0:IMPORT_REPORT")
+    if not with_discord:
+        env.pop("DISCORD_TOKEN", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    wall = next(float(line.split()[1]) for line in result.stdout.splitlines() if line.startswith("WALL"))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return wall, rows
+
+
+def package_costs(rows: List[Tuple[int, int, int, str]]) -> Dict[str, int]:
+    """Self time summed per top-level package (aiogram.types.x -> aiogram)."""
+    costs: Dict[str, int] = defaultdict(int)
+    for _, self_us, _, name in rows:
+        costs[name.split(".")[0]] += self_us
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="unified_bot", help="module to import (default: unified_bot)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters; the fastest run is reported")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument("--with-discord", action="store_true", help="keep DISCORD_TOKEN from the environment")
+    parser.add_argument("--budget", type=float, help="exit with status 1 if the import takes longer (seconds)")
+    args = parser.parse_args()
+
+    runs = [measure(args.module, args.with_discord) for _ in range(args.runs)]
+    wall, rows = min(runs, key=lambda run: run[0])
+
+    print(f"import {args.module}: {wall * 1000:.0f} ms "
+          f"(best of {args.runs}, all: {', '.join(f'{w * 1000:.0f}' for w, _ in runs)} ms)\n")
+
+    print(f"{'cumulative ms':>13} | {'self ms':>8} | module (imported directly by {args.module})")
+    top_level = [row for row in rows if row[0] == 1]
+    for _, self_us, cumulative_us, name in sorted(top_level, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>13.1f} | {self_us / 1000:>8.1f} | {name}")
+
+    print(f"\n{'self ms':>13} | package (all modules of the package)")
+    costs = package_costs(rows)
+    for name, self_us in sorted(costs.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:>13.1f} | {name}")
+
+    loaded = {name.split(".")[0] for _, _, _, name in rows}
+    print("\nPlatform modules loaded: " + ", ".join(
+        f"{name} {'yes' if name in loaded else 'no'}" for name in ("discord", "flask", "aiohttp", "aiogram")
+    ))
+
+    if args.budget is not None and wall > args.budget:
+        print(f"\n❌ Over budget: {wall:.2f} s > {args.budget:.2f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the Telegram webhook route of a running bot (TELEGRAM_USE_WEBHOOK=true).
+
+Posts a synthetic update with the secret token. The in-process checks (secret
+token, malformed body, feeding the dispatcher) run under pytest in
+tests/test_webhook.py.
+
+    python scripts/webhook_smoke.py --url http://localhost:5000/telegram/webhook --secret "$TELEGRAM_WEBHOOK_SECRET"
+"""
+
+import argparse
+import json
+import os
+import time
+import urllib.request
+
+
+def synthetic_update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": -100, "type": "supergroup", "title": "smoke"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Smoke"},
+            "text": text,
+        },
+    }
+
+
+def post(url: str, secret: str, update: dict):
+    request = urllib.request.Request(
+        url, data=json.dumps(update).encode(), method="POST",
+        headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        print(response.status, response.read().decode())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="webhook URL of a running bot")
+    parser.add_argument("--secret", default=os.getenv("TELEGRAM_WEBHOOK_SECRET", ""), help="secret token")
+    parser.add_argument("--text", default="/start", help="message text of the synthetic update")
+    args = parser.parse_args()
+
+    post(args.url, args.secret, synthetic_update(int(time.time()), args.text))
@@ -0,0 +1,183 @@
+"""
+Live server-status boards: one pinned message per chat that the bot edits in
+place, instead of a new /servers message every time someone asks.
+
+Every interval the status is rendered once and compared (by content hash)
+with what each board shows; only boards whose text changed are edited. All
+boards share one edit budget per tick, oldest update first, so a status
+change fans out over several ticks instead of bursting into Telegram's edit
+limits. Boards are kept on disk and survive restarts.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from config import STATUS_BOARD_EDITS_PER_MINUTE, STATUS_BOARD_INTERVAL, STATUS_BOARDS_FILE
+from message_refresh import content_hash
+from outbound import notification_lane
+
+logger = logging.getLogger(__name__)
+
+BOARD_FOOTER = "\n\n📌 Сообщение обновляется автоматически"
+
+
+class Board:
+    __slots__ = ("chat_id", "message_id", "digest", "updated_at")
+
+    def __init__(self, chat_id: int, message_id: int, digest: Optional[str] = None, updated_at: float = 0.0):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.digest = digest
+        self.updated_at = updated_at
+
+
+class StatusBoards:
+    """Pinned status messages of all chats and the task that keeps them current."""
+
+    def __init__(
+        self,
+        render: Callable[[], Awaitable[str]],
+        path: Optional[str] = STATUS_BOARDS_FILE,
+        interval: float = STATUS_BOARD_INTERVAL,
+        edits_per_minute: int = STATUS_BOARD_EDITS_PER_MINUTE,
+    ):
+        self.render = render
+        self.path = path
+        self.interval = interval
+        # Общий бюджет правок на тик, не меньше одной
+        self.edits_per_tick = max(1, int(edits_per_minute * interval / 60))
+        self.edited = 0
+        self.skipped = 0
+        self._boards: Dict[int, Board] = {}
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._boards)
+
+    def get(self, chat_id: int) -> Optional[Board]:
+        return self._boards.get(chat_id)
+
+    async def text(self) -> str:
+        return await self.render() + BOARD_FOOTER
+
+    def add(self, chat_id: int, message_id: int, text: str) -> Optional[Board]:
+        """Register a freshly sent board; returns the board it replaces, if any."""
+        previous = self._boards.get(chat_id)
+        self._boards[chat_id] = Board(chat_id, message_id, content_hash(text), time.time())
+        self.save()
+        return previous
+
+    def remove(self, chat_id: int) -> Optional[Board]:
+        board = self._boards.pop(chat_id, None)
+        if board is not None:
+            self.save()
+        return board
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def start(self, bot: Bot):
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Status boards started: {len(self._boards)}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Status board update failed: {e}")
+
+    async def run_once(self):
+        if self._bot is None or not self._boards:
+            return
+        text = await self.text()  # одинаков для всех досок — рендерим один раз
+        digest = content_hash(text)
+
+        stale = [board for board in self._boards.values() if board.digest != digest]
+        self.skipped += len(self._boards) - len(stale)
+        stale.sort(key=lambda board: board.updated_at)  # дольше всех не обновлявшиеся — первыми
+        batch = stale[:self.edits_per_tick]
+        for board in batch:
+            await self._edit(board, text, digest)
+        if batch:
+            self.save()
+
+    async def _edit(self, board: Board, text: str, digest: str):
+        try:
+            with notification_lane():  # ответы на команды важнее обновления доски
+                await self._bot.edit_message_text(text, chat_id=board.chat_id, message_id=board.message_id)
+            self.edited += 1
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                # Сообщение удалили вручную — доска больше не существует
+                logger.info(f"Dropping status board in chat {board.chat_id}: {e}")
+                self._boards.pop(board.chat_id, None)
+                return
+        except TelegramForbiddenError as e:
+            logger.info(f"Dropping status board in chat {board.chat_id}: {e}")
+            self._boards.pop(board.chat_id, None)
+            return
+        board.digest = digest
+        board.updated_at = time.time()
+
+    def format(self) -> str:
+        return f"Досок статуса: {len(self._boards)}, правок: {self.edited}, без изменений: {self.skipped}"
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                boards = json.load(f).get("boards", [])
+            self._boards = {
+                int(b["chat_id"]): Board(int(b["chat_id"]), int(b["message_id"]), b.get("digest"),
+                                         float(b.get("updated_at", 0)))
+                for b in boards
+            }
+        except Exception as e:
+            logger.error(f"Error reading {self.path}: {e}")
+
+    def save(self) -> bool:
+        if not self.path:
+            return False
+        tmp_path = f"{self.path}.tmp"
+        boards = [
+            {"chat_id": b.chat_id, "message_id": b.message_id, "digest": b.digest, "updated_at": b.updated_at}
+            for b in self._boards.values()
+        ]
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({"boards": boards}, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"Error writing to {self.path}: {e}")
+            return False
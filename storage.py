@@ -0,0 +1,559 @@
+"""
+Storage backends for DataManager.
+JSON files (default) and SQLite in WAL mode with versioned schema migrations.
+"""
+
+import json
+import os
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, FrozenSet, Callable
+
+from config import (
+    RULES_FILE, ADMINS_FILE, BANNED_WORDS_FILE, INFO_FILE, RANK_FILE, CHATS_FILE,
+    STORAGE_BACKEND, SQLITE_DB_FILE
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADMINS: List[int] = [6766653541, 8259872971]
+
+# Version stamped into admins.json; 1 = legacy list[int], 2 = dict[str, username]
+ADMINS_SCHEMA_VERSION = 2
+
+# Where each setting lives in the JSON layout: key -> (file, field)
+JSON_SETTINGS: Dict[str, tuple] = {
+    "rules": (RULES_FILE, "rules"),
+    "info": (INFO_FILE, "info"),
+    "rank": (RANK_FILE, "rank_message"),
+    "family_chat_id": (INFO_FILE, "family_chat_id"),
+}
+
+# Settings a chat may override; everything else is global only
+CHAT_SETTINGS = ("rules", "info", "rank")
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every DataManager storage backend.
+
+    A backend missing any abstract method fails when it is created.
+    """
+
+    name = "base"
+
+    # Settings (rules, info, rank, family_chat_id)
+    @abstractmethod
+    def get_setting(self, key: str) -> Any:
+        ...
+
+    @abstractmethod
+    def set_setting(self, key: str, value: Any) -> bool:
+        ...
+
+    # Admins
+    @abstractmethod
+    def get_admins(self) -> Dict[str, str]:
+        ...
+
+    @abstractmethod
+    def add_admin(self, admin_id: int, username: str) -> bool:
+        ...
+
+    @abstractmethod
+    def remove_admin(self, admin_id: int) -> bool:
+        ...
+
+    def has_admin(self, admin_id: int) -> bool:
+        return int(admin_id) in self.get_admin_ids()
+
+    @abstractmethod
+    def get_admin_ids(self) -> FrozenSet[int]:
+        """Prebuilt set of admin IDs for O(1) membership checks."""
+
+    # Banned words
+    @abstractmethod
+    def get_words(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def add_word(self, word: str) -> bool:
+        ...
+
+    @abstractmethod
+    def remove_word(self, word: str) -> bool:
+        ...
+
+    def has_word(self, word: str) -> bool:
+        return word in self.get_words()
+
+    # Per-chat overrides
+    @abstractmethod
+    def get_chat(self, chat_id: int) -> Dict[str, Any]:
+        """All overrides of one chat: CHAT_SETTINGS keys that are set plus "words"."""
+
+    @abstractmethod
+    def set_chat_setting(self, chat_id: int, key: str, value: Any) -> bool:
+        ...
+
+    @abstractmethod
+    def add_chat_word(self, chat_id: int, word: str) -> bool:
+        ...
+
+    @abstractmethod
+    def remove_chat_word(self, chat_id: int, word: str) -> bool:
+        ...
+
+    def close(self):
+        pass
+
+
+class JsonStorage(StorageBackend):
+    """Original layout: one JSON file per data type in data/."""
+
+    name = "json"
+
+    def __init__(self):
+        self._ensure_data_files_exist()
+        self._admins: Dict[str, str] = self._migrate_admins()
+        self._admin_ids: FrozenSet[int] = frozenset(int(k) for k in self._admins)
+
+    def _ensure_data_files_exist(self):
+        """Ensure all required data files exist with default values."""
+        if not os.path.exists('data'):
+            os.makedirs('data')
+
+        default_files = {
+            RULES_FILE: {"rules": "Правила пока не установлены."},
+            RANK_FILE: {"rank_message": "Информация о рангах пока не установлена."},
+            ADMINS_FILE: {
+                "schema_version": ADMINS_SCHEMA_VERSION,
+                "admins": {str(admin_id): f"ID_{admin_id}" for admin_id in DEFAULT_ADMINS},
+            },
+            BANNED_WORDS_FILE: {"words": []},
+            INFO_FILE: {"info": "Информация пока не установлена."},
+        }
+
+        for file_path, default_data in default_files.items():
+            if not os.path.exists(file_path):
+                with open(file_path, 'w') as f:
+                    json.dump(default_data, f, indent=4)
+
+    def _read_json(self, file_path: str) -> Dict[str, Any]:
+        """Read data from JSON file."""
+        try:
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return {}
+
+    def _write_json(self, file_path: str, data: Dict[str, Any]) -> bool:
+        """Write data to JSON file."""
+        try:
+            with open(file_path, 'w') as f:
+                json.dump(data, f, indent=4)
+            return True
+        except Exception as e:
+            print(f"Error writing to {file_path}: {e}")
+            return False
+
+    # -----------------------------
+    # Settings
+    # -----------------------------
+    def get_setting(self, key: str) -> Any:
+        file_path, field = JSON_SETTINGS[key]
+        return self._read_json(file_path).get(field)
+
+    def set_setting(self, key: str, value: Any) -> bool:
+        file_path, field = JSON_SETTINGS[key]
+        # info.json также хранит family_chat_id, поэтому обновляем только своё поле
+        data = self._read_json(file_path)
+        data[field] = value
+        return self._write_json(file_path, data)
+
+    # -----------------------------
+    # Admins
+    # -----------------------------
+    def _migrate_admins(self) -> Dict[str, str]:
+        """Upgrade admins.json to the current schema once, at startup."""
+        data = self._read_json(ADMINS_FILE)
+        admins = data.get("admins", {})
+        if data.get("schema_version") == ADMINS_SCHEMA_VERSION and isinstance(admins, dict):
+            return admins
+
+        # Конвертируем старый формат list[int] в dict[str, username]
+        if isinstance(admins, list):
+            admins = {str(admin_id): f"ID_{admin_id}" for admin_id in admins}
+        elif not isinstance(admins, dict):
+            admins = {}
+
+        if self._write_admins(admins):
+            logger.info(f"Migrated {ADMINS_FILE} to schema version {ADMINS_SCHEMA_VERSION}")
+        return admins
+
+    def _write_admins(self, admins: Dict[str, str]) -> bool:
+        return self._write_json(ADMINS_FILE, {"schema_version": ADMINS_SCHEMA_VERSION, "admins": admins})
+
+    def _set_admins(self, admins: Dict[str, str]) -> bool:
+        if not self._write_admins(admins):
+            return False
+        self._admins = admins
+        self._admin_ids = frozenset(int(k) for k in admins)
+        return True
+
+    def get_admins(self) -> Dict[str, str]:
+        return dict(self._admins)
+
+    def get_admin_ids(self) -> FrozenSet[int]:
+        return self._admin_ids
+
+    def add_admin(self, admin_id: int, username: str) -> bool:
+        admin_id_str = str(admin_id)
+        if admin_id_str in self._admins:
+            return False
+        return self._set_admins({**self._admins, admin_id_str: username})
+
+    def remove_admin(self, admin_id: int) -> bool:
+        admin_id_str = str(admin_id)
+        if admin_id_str not in self._admins:
+            return False
+        admins = dict(self._admins)
+        del admins[admin_id_str]
+        return self._set_admins(admins)
+
+    # -----------------------------
+    # Banned words
+    # -----------------------------
+    def get_words(self) -> List[str]:
+        return self._read_json(BANNED_WORDS_FILE).get("words", [])
+
+    def add_word(self, word: str) -> bool:
+        words = self.get_words()
+        if word in words:
+            return False
+        words.append(word)
+        return self._write_json(BANNED_WORDS_FILE, {"words": words})
+
+    def remove_word(self, word: str) -> bool:
+        words = self.get_words()
+        if word not in words:
+            return False
+        words.remove(word)
+        return self._write_json(BANNED_WORDS_FILE, {"words": words})
+
+
+    # -----------------------------
+    # Per-chat overrides (data/chats.json, keyed by chat_id)
+    # -----------------------------
+    def _read_chats(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(CHATS_FILE):
+            return {}
+        return self._read_json(CHATS_FILE).get("chats", {})
+
+    def _update_chat(self, chat_id: int, update: Callable[[Dict[str, Any]], bool]) -> bool:
+        chats = self._read_chats()
+        chat = chats.setdefault(str(chat_id), {})
+        if not update(chat):
+            return False
+        return self._write_json(CHATS_FILE, {"chats": chats})
+
+    def get_chat(self, chat_id: int) -> Dict[str, Any]:
+        return self._read_chats().get(str(chat_id), {})
+
+    def set_chat_setting(self, chat_id: int, key: str, value: Any) -> bool:
+        def update(chat):
+            chat[key] = value
+            return True
+        return self._update_chat(chat_id, update)
+
+    def add_chat_word(self, chat_id: int, word: str) -> bool:
+        def update(chat):
+            words = chat.setdefault("words", [])
+            if word in words:
+                return False
+            words.append(word)
+            return True
+        return self._update_chat(chat_id, update)
+
+    def remove_chat_word(self, chat_id: int, word: str) -> bool:
+        def update(chat):
+            words = chat.get("words", [])
+            if word not in words:
+                return False
+            words.remove(word)
+            return True
+        return self._update_chat(chat_id, update)
+
+
+# Versioned schema: MIGRATIONS[i] upgrades the database to user_version i + 1.
+# Never edit an applied migration — append a new one instead.
+MIGRATIONS: List[str] = [
+    # 1: initial schema
+    """
+    CREATE TABLE settings (
+        key   TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE TABLE admins (
+        user_id  INTEGER PRIMARY KEY,
+        username TEXT NOT NULL
+    );
+
+    CREATE TABLE banned_words (
+        id   INTEGER PRIMARY KEY AUTOINCREMENT,
+        word TEXT NOT NULL UNIQUE
+    );
+    """,
+    # 2: per-chat overrides, indexed by chat_id
+    """
+    CREATE TABLE chat_settings (
+        chat_id INTEGER NOT NULL,
+        key     TEXT NOT NULL,
+        value   TEXT NOT NULL,
+        PRIMARY KEY (chat_id, key)
+    ) WITHOUT ROWID;
+
+    CREATE TABLE chat_banned_words (
+        id      INTEGER PRIMARY KEY AUTOINCREMENT,
+        chat_id INTEGER NOT NULL,
+        word    TEXT NOT NULL,
+        UNIQUE (chat_id, word)
+    );
+    """,
+]
+
+
+class SqliteStorage(StorageBackend):
+    """SQLite backend (WAL mode) with indexed admin and word lookups."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str = SQLITE_DB_FILE):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # Соединение используется и из потока Flask, и из event loop
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
+        previous_version = self.migrate()
+        if previous_version == 0:
+            self.import_json()
+        self._admin_ids: FrozenSet[int] = self._load_admin_ids()
+
+    @property
+    def schema_version(self) -> int:
+        return self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self) -> int:
+        """Apply pending migrations. Returns the schema version found on open."""
+        with self._lock:
+            current = self.schema_version
+            for version, script in enumerate(MIGRATIONS[current:], start=current + 1):
+                logger.info(f"Applying SQLite schema migration {version}")
+                self._conn.executescript(
+                    f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;"
+                )
+        return current
+
+    def import_json(self) -> bool:
+        """One-shot import of the legacy data/*.json files into a fresh database."""
+        source = JsonStorage.__new__(JsonStorage)  # без создания файлов по умолчанию
+
+        settings = {}
+        for key, (file_path, field) in JSON_SETTINGS.items():
+            if os.path.exists(file_path):
+                value = source._read_json(file_path).get(field)
+                if value is not None:
+                    settings[key] = value
+
+        if os.path.exists(ADMINS_FILE):
+            admins = source._read_json(ADMINS_FILE).get("admins", [])
+            if isinstance(admins, list):
+                admins = {str(admin_id): f"ID_{admin_id}" for admin_id in admins}
+        else:
+            admins = {str(admin_id): f"ID_{admin_id}" for admin_id in DEFAULT_ADMINS}
+
+        words = []
+        if os.path.exists(BANNED_WORDS_FILE):
+            words = source._read_json(BANNED_WORDS_FILE).get("words", [])
+
+        chat_settings, chat_words = [], []
+        for chat_id, chat in source._read_chats().items():
+            for key in CHAT_SETTINGS:
+                if key in chat:
+                    chat_settings.append((int(chat_id), key, json.dumps(chat[key])))
+            chat_words.extend((int(chat_id), w) for w in chat.get("words", []))
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                    [(k, json.dumps(v)) for k, v in settings.items()]
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO admins (user_id, username) VALUES (?, ?)",
+                    [(int(k), v) for k, v in admins.items()]
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO banned_words (word) VALUES (?)",
+                    [(w,) for w in words]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chat_settings (chat_id, key, value) VALUES (?, ?, ?)",
+                    chat_settings
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO chat_banned_words (chat_id, word) VALUES (?, ?)",
+                    chat_words
+                )
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"Error importing JSON data into SQLite: {e}")
+                return False
+
+        logger.info(
+            f"Imported JSON data into SQLite: {len(settings)} settings, "
+            f"{len(admins)} admins, {len(words)} banned words, "
+            f"{len(chat_settings)} chat settings, {len(chat_words)} chat words"
+        )
+        return True
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _write(self, sql: str, params: tuple = ()) -> bool:
+        try:
+            return self._execute(sql, params).rowcount > 0
+        except Exception as e:
+            logger.error(f"Error writing to {self.db_path}: {e}")
+            return False
+
+    # -----------------------------
+    # Settings
+    # -----------------------------
+    def get_setting(self, key: str) -> Any:
+        row = self._execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_setting(self, key: str, value: Any) -> bool:
+        return self._write(
+            "INSERT INTO settings (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+
+    # -----------------------------
+    # Admins
+    # -----------------------------
+    def get_admins(self) -> Dict[str, str]:
+        rows = self._execute("SELECT user_id, username FROM admins ORDER BY rowid").fetchall()
+        return {str(user_id): username for user_id, username in rows}
+
+    def _load_admin_ids(self) -> FrozenSet[int]:
+        return frozenset(row[0] for row in self._execute("SELECT user_id FROM admins").fetchall())
+
+    def get_admin_ids(self) -> FrozenSet[int]:
+        return self._admin_ids
+
+    def add_admin(self, admin_id: int, username: str) -> bool:
+        added = self._write(
+            "INSERT OR IGNORE INTO admins (user_id, username) VALUES (?, ?)",
+            (int(admin_id), username)
+        )
+        if added:
+            self._admin_ids = self._load_admin_ids()
+        return added
+
+    def remove_admin(self, admin_id: int) -> bool:
+        removed = self._write("DELETE FROM admins WHERE user_id = ?", (int(admin_id),))
+        if removed:
+            self._admin_ids = self._load_admin_ids()
+        return removed
+
+    def has_admin(self, admin_id: int) -> bool:
+        row = self._execute("SELECT 1 FROM admins WHERE user_id = ?", (int(admin_id),)).fetchone()
+        return row is not None
+
+    # -----------------------------
+    # Banned words
+    # -----------------------------
+    def get_words(self) -> List[str]:
+        rows = self._execute("SELECT word FROM banned_words ORDER BY id").fetchall()
+        return [row[0] for row in rows]
+
+    def add_word(self, word: str) -> bool:
+        return self._write("INSERT OR IGNORE INTO banned_words (word) VALUES (?)", (word,))
+
+    def remove_word(self, word: str) -> bool:
+        return self._write("DELETE FROM banned_words WHERE word = ?", (word,))
+
+    def has_word(self, word: str) -> bool:
+        row = self._execute("SELECT 1 FROM banned_words WHERE word = ?", (word,)).fetchone()
+        return row is not None
+
+    # -----------------------------
+    # Per-chat overrides
+    # -----------------------------
+    def get_chat(self, chat_id: int) -> Dict[str, Any]:
+        chat: Dict[str, Any] = {}
+        rows = self._execute(
+            "SELECT key, value FROM chat_settings WHERE chat_id = ?", (int(chat_id),)
+        ).fetchall()
+        for key, value in rows:
+            chat[key] = json.loads(value)
+        words = self._execute(
+            "SELECT word FROM chat_banned_words WHERE chat_id = ? ORDER BY id", (int(chat_id),)
+        ).fetchall()
+        if words:
+            chat["words"] = [row[0] for row in words]
+        return chat
+
+    def set_chat_setting(self, chat_id: int, key: str, value: Any) -> bool:
+        return self._write(
+            "INSERT INTO chat_settings (chat_id, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(chat_id, key) DO UPDATE SET value = excluded.value",
+            (int(chat_id), key, json.dumps(value))
+        )
+
+    def add_chat_word(self, chat_id: int, word: str) -> bool:
+        return self._write(
+            "INSERT OR IGNORE INTO chat_banned_words (chat_id, word) VALUES (?, ?)",
+            (int(chat_id), word)
+        )
+
+    def remove_chat_word(self, chat_id: int, word: str) -> bool:
+        return self._write(
+            "DELETE FROM chat_banned_words WHERE chat_id = ? AND word = ?", (int(chat_id), word)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS = {
+    JsonStorage.name: JsonStorage,
+    SqliteStorage.name: SqliteStorage,
+}
+
+
+def create_storage(backend: Optional[str] = None) -> StorageBackend:
+    """Create the storage backend selected by STORAGE_BACKEND (json by default)."""
+    backend = (backend or STORAGE_BACKEND).lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown storage backend '{backend}', falling back to json")
+        backend = JsonStorage.name
+    return BACKENDS[backend]()
@@ -0,0 +1,51 @@
+import asyncio
+
+from concurrency import ConcurrencyMiddleware
+from outbound import REPLY, OutboundLimiter
+
+BUSY_GROUP = -100
+OTHER_GROUP = -200
+
+
+class Recorder(ConcurrencyMiddleware):
+    """Records shed updates instead of answering them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rejected = []
+
+    async def reject(self, message):
+        self.rejected.append(message)
+
+
+def make_handler(limiter: OutboundLimiter, sent: list):
+    async def handler(chat_id, data):
+        await limiter.acquire(chat_id, REPLY)  # ответ на команду, как message.answer()
+        sent.append(chat_id)
+    return handler
+
+
+async def rules_storm():
+    middleware = Recorder(max_concurrent=4, command_limits={}, queue_timeout=0.2)
+    limiter = OutboundLimiter()
+    sent = []
+    handler = make_handler(limiter, sent)
+
+    storm = [asyncio.create_task(middleware(handler, BUSY_GROUP, {})) for _ in range(40)]
+    await asyncio.sleep(0.05)
+    await asyncio.wait_for(middleware(handler, OTHER_GROUP, {}), 1.0)
+    result = (list(middleware.rejected), list(sent))
+
+    for task in storm:
+        task.cancel()
+    await asyncio.gather(*storm, return_exceptions=True)
+    return middleware, result
+
+
+def test_replies_waiting_for_a_group_do_not_hold_slots():
+    middleware, (rejected, sent) = asyncio.run(rules_storm())
+    assert rejected == []
+    assert OTHER_GROUP in sent
+    assert sent.count(BUSY_GROUP) == 5  # запас группы, остальные ждут токенов без слота
+    assert middleware.total.active == 0
+    assert middleware._slots._value == 4
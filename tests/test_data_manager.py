@@ -0,0 +1,39 @@
+import data_manager as data_manager_module
+from data_manager import WORDS, DataManager
+from storage import JsonStorage, SqliteStorage
+
+
+def test_managers_on_one_storage_share_caches_and_events(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = SqliteStorage(":memory:")
+    writer, reader = DataManager(storage), DataManager(storage)
+    events = []
+    reader.subscribe(events.append, WORDS)
+
+    # Читатель заполняет свои кэши до записи
+    assert reader.get_rules() == "Правила пока не установлены."
+    assert reader.get_banned_words(-100) == []
+
+    writer.set_rules("Не флудить")
+    writer.set_rules("Свои правила", chat_id=-100)
+    writer.add_banned_word("реклама")
+    writer.add_banned_word("казино", chat_id=-100)
+
+    assert reader.get_rules() == "Не флудить"
+    assert reader.get_rules(-100) == "Свои правила"
+    assert reader.get_banned_words(-100) == ["реклама", "казино"]
+    assert [e.chat_id for e in events] == [None, -100]
+    assert reader.version(WORDS) == writer.version(WORDS) == 2
+
+
+def test_default_managers_share_one_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_manager_module, "_default_storage", JsonStorage())
+    first, second = DataManager(), DataManager()
+    assert first.storage is second.storage
+
+    assert second.get_admin_ids() == first.get_admin_ids()
+    first.add_admin(42, "new_admin")
+    assert 42 in second.get_admin_ids()
+    first.set_info("Клан Mensem")
+    assert second.get_info() == "Клан Mensem"
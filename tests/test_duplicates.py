@@ -0,0 +1,59 @@
+import random
+
+from duplicates import DuplicateIndex
+
+AD = ("Продам аккаунт Arizona RP 15 уровня, сервер Phoenix, много денег и машин. "
+      "Пишите в ЛС, цена договорная, торг!")
+LETTERS = "абвгдежзийклмнопрстуфхцчшщыьэюя"
+
+
+def edit(rng: random.Random, text: str, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[i] = rng.choice(LETTERS)
+        elif op < 0.7:
+            chars.insert(i, rng.choice(LETTERS))
+        else:
+            del chars[i]
+    return "".join(chars)
+
+
+def is_copy(original: str, variant: str) -> bool:
+    index = DuplicateIndex(threshold=2)
+    index.add(original, -1, 1, now=0)
+    return index.add(variant, -2, 2, now=1) is not None
+
+
+def test_hand_edited_variants_are_copies():
+    assert is_copy(AD, AD.replace("15", "16"))
+    assert is_copy(AD, AD.replace("Продам", "ПРОДАЮ"))
+    assert is_copy(AD, AD.replace("Phoenix", "Phoenlx").replace("торг", "торг!!!"))
+
+
+def test_random_edits_are_caught():
+    rng = random.Random(1)
+    for edits, expected in ((1, 0.95), (2, 0.95), (3, 0.9)):
+        caught = sum(is_copy(AD, edit(rng, AD, edits)) for _ in range(200))
+        assert caught / 200 >= expected, f"{edits} edit(s): {caught}/200"
+
+
+def test_unrelated_messages_are_not_copies():
+    other = "Сегодня вечером идём всей семьёй на сервер, кто с нами — отпишитесь в беседе, будет весело!"
+    assert not is_copy(AD, other)
+
+
+def test_third_copy_in_other_chats_is_reported():
+    index = DuplicateIndex(threshold=3)
+    assert index.add(AD, -1, 1, now=0) is None
+    assert index.add(AD.replace("15", "16"), -2, 2, now=1) is None
+    duplicate = index.add(AD.replace("Продам", "Продаю"), -3, 3, now=2)
+    assert duplicate is not None and duplicate.copies == 2 and duplicate.chats == 3
+
+
+def test_copies_expire():
+    index = DuplicateIndex(threshold=2, ttl=10)
+    index.add(AD, -1, 1, now=0)
+    assert index.add(AD, -2, 2, now=11) is None
@@ -0,0 +1,25 @@
+import asyncio
+from types import SimpleNamespace
+
+from data_manager import DataManager
+from filters import IsAdmin, PermissionSet
+from storage import SqliteStorage
+
+CREATOR = 1
+
+
+def test_admin_changes_reach_the_filter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # без data/*.json: импортировать нечего
+    data_manager = DataManager(SqliteStorage(":memory:"))
+    permissions = PermissionSet(data_manager, creator_id=CREATOR)
+    message = SimpleNamespace(from_user=SimpleNamespace(id=5))
+
+    def is_admin() -> bool:
+        return asyncio.run(IsAdmin()(message, permissions=permissions))
+
+    assert not is_admin()
+    data_manager.add_admin(5, "new_admin")
+    assert is_admin()
+    data_manager.remove_admin(5)
+    assert not is_admin()
+    assert permissions.is_admin(CREATOR)
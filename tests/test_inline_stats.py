@@ -0,0 +1,51 @@
+import asyncio
+
+from arizona_api import arizona_api
+from inline_stats import InlineStats
+from throttling import CommandLimit, Throttler
+
+USER = 1000
+
+
+def make_stats(monkeypatch) -> list:
+    """Two API lookups per minute; returns the list of nicknames that reached the API."""
+    requested = []
+
+    async def request(nickname, server_id):
+        requested.append(nickname)
+        return {"level": 10, "hours_played": 5}, None
+
+    monkeypatch.setattr(arizona_api, "_request_player_stats", request)
+    monkeypatch.setattr(arizona_api, "format_stats", lambda data, nickname, server_id: nickname)
+    monkeypatch.setattr(arizona_api, "_player_cache", type(arizona_api._player_cache)())
+    return requested
+
+
+def test_inline_lookups_share_the_stats_limit(monkeypatch):
+    requested = make_stats(monkeypatch)
+    stats = InlineStats(Throttler({"stats": CommandLimit(2, 100)}))
+
+    async def lookups():
+        return [await stats.lookup(f"{nickname} 18", USER)
+                for nickname in ("First_Player", "Second_Player", "Third_Player", "First_Player")]
+
+    first, second, third, repeat = asyncio.run(lookups())
+    assert requested == ["First_Player", "Second_Player"]
+    assert not first.is_personal and not second.is_personal
+    assert third.is_personal and "Слишком часто" in third.results[0].title + third.results[0].description
+    assert third.cache_time <= 31
+    assert repeat.results[0].input_message_content.message_text == "First_Player"  # из кэша, без квоты
+    assert stats.throttled == 1
+
+
+def test_other_users_are_not_throttled(monkeypatch):
+    requested = make_stats(monkeypatch)
+    stats = InlineStats(Throttler({"stats": CommandLimit(1, 100)}))
+
+    async def lookups():
+        await stats.lookup("First_Player 18", USER)
+        return await stats.lookup("Second_Player 18", USER + 1)
+
+    answer = asyncio.run(lookups())
+    assert requested == ["First_Player", "Second_Player"]
+    assert not answer.is_personal
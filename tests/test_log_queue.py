@@ -0,0 +1,105 @@
+import gzip
+import logging
+import os
+import queue
+import sys
+import time
+
+from log_queue import DebugSampler, DroppingQueueHandler, SizedTimedRotatingFileHandler
+
+
+def make_record(msg: str = "message", level: int = logging.INFO, lineno: int = 1, args=None,
+                exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("test", level, "bot.py", lineno, msg, args, exc_info)
+
+
+def rotated(tmp_path) -> list:
+    return sorted(name for name in os.listdir(tmp_path) if name.startswith("bot.log."))
+
+
+def test_prepare_renders_message_and_traceback_before_queueing():
+    handler = DroppingQueueHandler(queue.Queue())
+    players = ["Nick_Name"]
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record("players: %s", args=(players,), exc_info=sys.exc_info())
+    handler.handle(record)
+    players.append("Other_Player")  # event loop меняет аргумент после логирования
+
+    queued = handler.queue.get_nowait()
+    assert queued.getMessage() == "players: ['Nick_Name']"
+    assert queued.args is None and queued.exc_info is None
+    assert "ValueError: boom" in queued.exc_text
+    assert "ValueError: boom" in logging.Formatter().format(queued)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(make_record(f"record {i}"))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_debug_sampler_keeps_first_then_every_nth_per_call_site():
+    sampler = DebugSampler(3)
+    kept = [sampler.filter(make_record(level=logging.DEBUG, lineno=10)) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampler.filter(make_record(level=logging.DEBUG, lineno=11))  # другое место вызова
+    assert all(sampler.filter(make_record(level=logging.INFO, lineno=10)) for _ in range(5))
+    assert sampler.sampled_out == 4
+
+
+def test_rotates_by_size_and_compresses(tmp_path):
+    path = str(tmp_path / "bot.log")
+    handler = SizedTimedRotatingFileHandler(path, max_bytes=100, interval=0, backup_count=10)
+    for i in range(6):
+        handler.emit(make_record("x" * 40 + str(i)))
+    handler.close()
+
+    backups = rotated(tmp_path)
+    assert len(backups) == 2 and all(name.endswith(".gz") for name in backups)
+    contents = set()
+    for name in backups:
+        with gzip.open(tmp_path / name, "rt", encoding="utf-8") as f:
+            contents.add(f.read())
+    line = "x" * 40 + "{}\n"
+    assert contents == {line.format(0) + line.format(1), line.format(2) + line.format(3)}
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == line.format(4) + line.format(5)
+
+
+def test_rotates_by_age(tmp_path):
+    path = str(tmp_path / "bot.log")
+    handler = SizedTimedRotatingFileHandler(path, max_bytes=0, interval=3600, backup_count=10)
+    handler.emit(make_record("old"))
+    handler.emit(make_record("still fresh"))
+    assert rotated(tmp_path) == []
+
+    handler.rollover_at = time.time() - 1
+    handler.emit(make_record("new"))
+    handler.close()
+    assert len(rotated(tmp_path)) == 1
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "new\n"
+
+
+def test_prunes_oldest_backups(tmp_path):
+    path = str(tmp_path / "bot.log")
+    handler = SizedTimedRotatingFileHandler(path, max_bytes=0, interval=3600, backup_count=2,
+                                            compress=False)
+    seen = set()
+    for i in range(5):
+        handler.emit(make_record(f"generation {i}"))
+        handler.doRollover()
+        # Все ротации в одну секунду: задаём время изменения явно, prune смотрит на mtime
+        for name in set(rotated(tmp_path)) - seen:
+            os.utime(tmp_path / name, (1000 + i, 1000 + i))
+        seen = set(rotated(tmp_path))
+    handler.close()
+
+    backups = handler.backups()
+    assert len(backups) == 2
+    contents = [open(name, encoding="utf-8").read() for name in backups]
+    assert contents == ["generation 3\n", "generation 4\n"]
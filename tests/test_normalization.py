@@ -0,0 +1,15 @@
+import sys
+
+from normalization import WHITESPACE, normalize
+
+
+def test_whitespace_covers_every_isspace_character():
+    assert set(WHITESPACE) == {chr(code) for code in range(sys.maxunicode + 1) if chr(code).isspace()}
+
+
+def test_unicode_whitespace_keeps_offsets_aligned():
+    text = "　  казино тут "
+    normalized = normalize(text)
+    assert normalized.text == "казино тут"
+    start, end = normalized.span(0, len("казино"))
+    assert text[start:end] == "казино"
@@ -0,0 +1,80 @@
+import re
+import time
+
+import pytest
+
+from patterns import PatternError, validate_pattern
+from word_matcher import CompiledWords, search_windowed
+
+# Полиномиальный бэктрекинг: соседние или пересекающиеся повторения
+SLOW_PATTERNS = [
+    r"re:\w*\w*z",
+    r"re:.*.*z",
+    r"re:[а-я]*[а-я]*!",
+    r"re:a{1,100}a{1,100}a{1,100}b",
+    r"re:.*a.*z",
+    r"re:(\w+)\w*!",
+    r"re:a*(b|a*)z",
+    r"re:x{1,90}y{1,90}z{1,90}",
+]
+
+USEFUL_PATTERNS = [
+    r"re:\bкот\b",
+    r"re:к[оа]зино",
+    r"re:к\W*а\W*з",
+    r"re:\d+\s*руб",
+    r"re:ка+зино",
+    r"re:t\.me/\w+",
+    "казин*",
+]
+
+
+@pytest.mark.parametrize("pattern", SLOW_PATTERNS)
+def test_polynomial_backtracking_is_rejected(pattern):
+    with pytest.raises(PatternError):
+        validate_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", USEFUL_PATTERNS)
+def test_useful_patterns_are_accepted(pattern):
+    assert validate_pattern(pattern) == pattern
+
+
+def test_single_unbounded_repeat_is_bounded_on_long_messages():
+    matcher = CompiledWords([r"re:.*z", r"re:a.*z"])
+    started = time.perf_counter()
+    assert matcher.search("a" * 4096) is None
+    assert time.perf_counter() - started < 0.5
+
+
+def test_windowed_search_keeps_word_boundaries():
+    pattern = re.compile(r"\bкот\b", re.IGNORECASE)
+    text = "x" * 60 + " котлета " + "y" * 60 + " кот"
+    m = search_windowed(pattern, text, window=64, overlap=16)
+    assert m is not None and m.start() == text.rindex("кот")
+    assert search_windowed(pattern, "x" * 60 + " котлета", window=64, overlap=16) is None
+
+
+def test_match_far_into_a_long_message_is_found():
+    matcher = CompiledWords([r"re:t\.me/\w+"])
+    match = matcher.search("x" * 3000 + " t.me/spam")
+    assert match is not None and match.fragment == "t.me/spam"
+
+
+@pytest.mark.parametrize("prefix", [340, 350, 383, 450, 509])
+def test_long_match_across_a_window_boundary_is_found(prefix):
+    # 203 символа: длиннее REGEX_OVERLAP, начинается до перекрытия и кончается за границей окна
+    matcher = CompiledWords([r"re:a\d{1,100}-\d{1,100}z"])
+    fragment = "a" + "1" * 100 + "-" + "2" * 100 + "z"
+    match = matcher.search("x" * prefix + fragment + " y" * 300)
+    assert match is not None and match.fragment == fragment
+
+
+def test_unbounded_repeats_are_capped_not_split():
+    link = "t.me/" + "s" * 300
+    for prefix in range(300, 520, 7):
+        match = CompiledWords([r"re:t\.me/\w+"]).search("x" * prefix + " " + link)
+        assert match is not None and match.fragment == link[:105]
+    for prefix in range(250, 260):
+        match = CompiledWords(["казин*"]).search("x " * prefix + "казинобонус")
+        assert match is not None and match.fragment == "казинобонус"
@@ -0,0 +1,83 @@
+import json
+import sqlite3
+
+import pytest
+
+from storage import MIGRATIONS, JsonStorage, SqliteStorage, StorageBackend
+
+# data/ в формате до user-027: администраторы списком, без schema_version
+V1_DATA = {
+    "rules.json": {"rules": "Не флудить"},
+    "info.json": {"info": "Клан Mensem", "family_chat_id": -100},
+    "rank.json": {"rank_message": "Ранги по активности"},
+    "admins.json": {"admins": [111, 222]},
+    "banned_words.json": {"words": ["реклама", "казино*"]},
+    "chats.json": {"chats": {"-200": {"rules": "Правила группы", "words": ["спам"]}}},
+}
+
+
+@pytest.fixture
+def v1_data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    for name, content in V1_DATA.items():
+        (tmp_path / "data" / name).write_text(json.dumps(content), encoding="utf-8")
+    return tmp_path
+
+
+def test_incomplete_backend_fails_on_creation():
+    class Partial(StorageBackend):
+        def get_setting(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_v1_json_is_imported_into_a_fresh_database(v1_data_dir):
+    storage = SqliteStorage(str(v1_data_dir / "data" / "mensem.db"))
+    assert storage.schema_version == len(MIGRATIONS)
+
+    assert storage.get_setting("rules") == "Не флудить"
+    assert storage.get_setting("info") == "Клан Mensem"
+    assert storage.get_setting("family_chat_id") == -100
+    assert storage.get_setting("rank") == "Ранги по активности"
+    assert storage.get_admins() == {"111": "ID_111", "222": "ID_222"}
+    assert storage.get_admin_ids() == frozenset({111, 222})
+    assert storage.get_words() == ["реклама", "казино*"]
+    assert storage.get_chat(-200) == {"rules": "Правила группы", "words": ["спам"]}
+    assert storage.get_chat(-300) == {}
+    storage.close()
+
+
+def test_reopening_does_not_import_again(v1_data_dir):
+    db_path = str(v1_data_dir / "data" / "mensem.db")
+    storage = SqliteStorage(db_path)
+    storage.remove_word("реклама")
+    storage.close()
+
+    storage = SqliteStorage(db_path)
+    assert storage.get_words() == ["казино*"]
+    storage.close()
+
+
+def test_pending_migrations_upgrade_an_existing_database(v1_data_dir):
+    db_path = str(v1_data_dir / "data" / "mensem.db")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.executescript(f"BEGIN;\n{MIGRATIONS[0]}\nPRAGMA user_version = 1;\nCOMMIT;")
+    conn.execute("INSERT INTO banned_words (word) VALUES ('старое')")
+    conn.close()
+
+    storage = SqliteStorage(db_path)
+    assert storage.schema_version == len(MIGRATIONS)
+    assert storage.get_words() == ["старое"]  # база не пустая: JSON не импортируется
+    assert storage.add_chat_word(-200, "спам")
+    assert storage.get_chat(-200) == {"words": ["спам"]}
+    storage.close()
+
+
+def test_json_storage_migrates_v1_admins(v1_data_dir):
+    storage = JsonStorage()
+    assert storage.get_admin_ids() == frozenset({111, 222})
+    data = json.loads((v1_data_dir / "data" / "admins.json").read_text(encoding="utf-8"))
+    assert data == {"schema_version": 2, "admins": {"111": "ID_111", "222": "ID_222"}}
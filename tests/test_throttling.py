@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.filters import CommandObject
+
+from throttling import CommandLimit, Throttler, ThrottlingMiddleware
+
+ADMIN = 1
+USER = 1000
+GROUP = -100
+
+
+def test_user_bucket_refills_at_the_per_minute_rate():
+    throttler = Throttler({"stats": CommandLimit(2, 100)})
+    assert throttler.hit("stats", USER, GROUP, now=0) == 0
+    assert throttler.hit("stats", USER, GROUP, now=0) == 0
+    assert throttler.hit("stats", USER, GROUP, now=0) == 30
+    assert throttler.hit("stats", USER + 1, GROUP, now=0) == 0  # другой пользователь
+    assert throttler.hit("stats", USER, GROUP, now=30) == 0
+    assert throttler.hit("stats", USER, None, now=30) > 0  # в личке тот же лимит пользователя
+
+
+def test_chat_bucket_limits_the_whole_group():
+    throttler = Throttler({"stats": CommandLimit(100, 2)})
+    assert throttler.hit("stats", USER, GROUP, now=0) == 0
+    assert throttler.hit("stats", USER + 1, GROUP, now=0) == 0
+    assert throttler.hit("stats", USER + 2, GROUP, now=0) == 30
+    assert throttler.hit("stats", USER + 2, GROUP - 1, now=0) == 0
+    assert throttler.hit("stats", USER + 2, None, now=0) == 0
+
+
+def test_zero_means_no_limit():
+    throttler = Throttler({"stats": CommandLimit(0, 0), "servers": CommandLimit(0, 1)})
+    assert all(throttler.hit("stats", USER, GROUP, now=0) == 0 for _ in range(100))
+    assert len(throttler) == 0
+    assert throttler.hit("servers", USER, GROUP, now=0) == 0
+    assert throttler.hit("servers", USER + 1, GROUP, now=0) == 60
+    assert throttler.hit("rules", USER, GROUP, now=0) == 0  # без лимита в COMMAND_LIMITS
+
+
+def test_refilled_buckets_are_evicted():
+    throttler = Throttler({"stats": CommandLimit(2, 2)}, max_tracked=3)
+    for user_id in range(5):
+        throttler.hit("stats", user_id, None, now=0)
+    assert len(throttler) == 3  # сверх max_tracked вытесняются самые давние
+    throttler.hit("stats", USER, None, now=60)  # остальные успели восстановиться
+    assert len(throttler) == 1
+
+
+def test_one_notice_per_window():
+    throttler = Throttler()
+    assert throttler.should_notify("stats", USER, 30, now=0)
+    assert not throttler.should_notify("stats", USER, 30, now=10)
+    assert throttler.should_notify("stats", USER + 1, 30, now=10)
+    assert throttler.should_notify("stats", USER, 30, now=31)
+
+
+class Scheduler:
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, chat_id, message_id, ttl):
+        self.scheduled.append((chat_id, message_id))
+
+
+def make_message(user_id: int, replies: list):
+    async def reply(text):
+        replies.append(text)
+        return SimpleNamespace(chat=SimpleNamespace(id=GROUP), message_id=len(replies))
+
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=user_id), chat=SimpleNamespace(id=GROUP, type="supergroup"), reply=reply,
+    )
+
+
+def run_commands(user_id: int, count: int):
+    permissions = SimpleNamespace(is_admin=lambda uid: uid == ADMIN)
+    scheduler = Scheduler()
+    middleware = ThrottlingMiddleware(permissions, scheduler, Throttler({"stats": CommandLimit(1, 100)}))
+    handled, replies = [], []
+
+    async def handler(event, data):
+        handled.append(event)
+
+    async def commands():
+        for _ in range(count):
+            await middleware(handler, make_message(user_id, replies), {"command": CommandObject(command="stats")})
+
+    asyncio.run(commands())
+    return middleware, handled, replies, scheduler
+
+
+def test_admins_are_exempt():
+    middleware, handled, replies, _ = run_commands(ADMIN, 5)
+    assert len(handled) == 5 and replies == [] and middleware.throttled == 0
+
+
+def test_throttled_user_is_noticed_once():
+    middleware, handled, replies, scheduler = run_commands(USER, 4)
+    assert len(handled) == 1
+    assert middleware.throttled == 3
+    assert len(replies) == 1 and "Слишком часто" in replies[0]
+    assert scheduler.scheduled == [(GROUP, 1)]
@@ -0,0 +1,106 @@
+import asyncio
+import datetime
+import threading
+import time
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Chat, Message
+
+from keep_alive import TELEGRAM_WEBHOOK_PATH, app, set_telegram_handler
+
+SECRET = "test-secret"
+
+
+def synthetic_update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": -100, "type": "supergroup", "title": "test"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+class RecordingSession(BaseSession):
+    """Records Bot API calls instead of sending them."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        self.sent.append(method)
+        return Message(message_id=1, date=datetime.datetime.now(),
+                       chat=Chat(id=-100, type="supergroup"), text=getattr(method, "text", ""))
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+
+@pytest.fixture
+def webhook():
+    """Webhook route wired to a dispatcher on a background loop, as UnifiedBot.feed_webhook_update does."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    bot = Bot(token="42:TEST", session=RecordingSession())
+    dp = Dispatcher()
+    state = {"handled": [], "futures": [], "bot": bot, "client": app.test_client()}
+
+    @dp.message()
+    async def echo(message: Message):
+        state["handled"].append(message.text)
+        await message.answer(f"echo: {message.text}")
+
+    def feed(update: dict):
+        state["futures"].append(asyncio.run_coroutine_threadsafe(dp.feed_webhook_update(bot, update), loop))
+
+    set_telegram_handler(feed, SECRET)
+    yield state
+    set_telegram_handler(None, None)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def post(client, body=None, secret=SECRET, **kwargs):
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret is not None else {}
+    return client.post(TELEGRAM_WEBHOOK_PATH, json=body, headers=headers, **kwargs)
+
+
+def test_update_is_fed_to_the_dispatcher(webhook):
+    response = post(webhook["client"], synthetic_update(1, "/start"))
+    for future in webhook["futures"]:
+        future.result(timeout=5)
+
+    assert response.status_code == 200 and response.get_json() == {"ok": True}
+    assert webhook["handled"] == ["/start"]
+    assert [type(m).__name__ for m in webhook["bot"].session.sent] == ["SendMessage"]
+
+
+@pytest.mark.parametrize("secret", ["wrong", "", None])
+def test_wrong_or_missing_secret_is_rejected(webhook, secret):
+    response = post(webhook["client"], synthetic_update(2, "x"), secret=secret)
+    assert response.status_code == 403
+    assert webhook["futures"] == []
+
+
+def test_malformed_body_is_rejected(webhook):
+    response = post(webhook["client"], data="not json", content_type="application/json")
+    assert response.status_code == 400
+    assert post(webhook["client"], [1, 2, 3]).status_code == 400
+    assert webhook["futures"] == []
+
+
+def test_disabled_webhook_answers_503():
+    set_telegram_handler(None, None)
+    response = post(app.test_client(), synthetic_update(3, "x"))
+    assert response.status_code == 503
@@ -0,0 +1,42 @@
+from data_manager import DataManager
+from storage import SqliteStorage
+from word_matcher import BannedWordMatcher
+
+GROUP = -100
+OTHER = -200
+
+
+def make_matcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager = DataManager(SqliteStorage(":memory:"))
+    data_manager.add_banned_word("реклама")
+    return data_manager, BannedWordMatcher(data_manager)
+
+
+def test_chats_without_own_words_share_the_global_matcher(tmp_path, monkeypatch):
+    data_manager, matcher = make_matcher(tmp_path, monkeypatch)
+    shared = matcher.for_chat(None)
+    for chat_id in range(-1, -300, -1):
+        assert matcher.for_chat(chat_id) == shared
+        assert matcher.search("тут реклама", chat_id).word == "реклама"
+    assert matcher.builds == 1
+
+
+def test_chat_additions_are_compiled_separately(tmp_path, monkeypatch):
+    data_manager, matcher = make_matcher(tmp_path, monkeypatch)
+    data_manager.add_banned_word("казино", chat_id=GROUP)
+
+    assert matcher.search("заходи в казино", GROUP).word == "казино"
+    assert matcher.search("тут реклама", GROUP).word == "реклама"
+    assert matcher.search("заходи в казино", OTHER) is None
+    assert matcher.builds == 2
+
+    # Изменение глобального списка не пересобирает дополнения чата
+    data_manager.add_banned_word("спам")
+    assert matcher.search("это спам", GROUP).word == "спам"
+    assert matcher.search("заходи в казино", GROUP).word == "казино"
+    assert matcher.builds == 3
+
+    data_manager.remove_banned_word("казино", chat_id=GROUP)
+    assert matcher.search("заходи в казино", GROUP) is None
+    assert len(matcher.for_chat(GROUP)) == 1
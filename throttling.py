@@ -0,0 +1,150 @@
+"""
+Per-user and per-chat throttling of commands that cost Deps API quota.
+
+Every (command, user) and (command, group chat) pair gets a token bucket
+refilled at the command's per-minute limit (0 = no limit). A bucket that
+refilled completely carries no information, so idle pairs are evicted and
+memory follows the number of recently active users. Admins and the creator
+are exempt. A throttled user gets one notice per window, the rest of their
+requests are dropped silently.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.filters import CommandObject
+from aiogram.types import Message
+
+from config import (
+    SERVERS_CHAT_PER_MINUTE, SERVERS_USER_PER_MINUTE, STATS_CHAT_PER_MINUTE, STATS_USER_PER_MINUTE
+)
+from deletion_scheduler import DeletionScheduler
+from filters import PermissionSet
+from outbound import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+NOTICE_TTL = 15            # секунд до удаления уведомления
+MAX_TRACKED = 50000
+
+BucketKey = Tuple[str, str, int]  # (команда, "user" | "chat", id)
+
+
+class CommandLimit(NamedTuple):
+    user_per_minute: int
+    chat_per_minute: int
+
+
+COMMAND_LIMITS: Dict[str, CommandLimit] = {
+    "stats": CommandLimit(STATS_USER_PER_MINUTE, STATS_CHAT_PER_MINUTE),
+    "servers": CommandLimit(SERVERS_USER_PER_MINUTE, SERVERS_CHAT_PER_MINUTE),
+}
+
+
+class Throttler:
+    """Token buckets of recently active users and chats, per command."""
+
+    def __init__(self, limits: Optional[Dict[str, CommandLimit]] = None, max_tracked: int = MAX_TRACKED):
+        self.limits = COMMAND_LIMITS if limits is None else limits
+        self.max_tracked = max_tracked
+        self._buckets: "OrderedDict[BucketKey, TokenBucket]" = OrderedDict()
+        self._noticed: "OrderedDict[Tuple[str, int], float]" = OrderedDict()  # до какого момента не уведомлять
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _bucket(self, key: BucketKey, per_minute: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(per_minute / 60, per_minute)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _evict(self, now: float):
+        # С начала лежат давно не использованные; полностью восстановленный бакет не нужен
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if bucket.full_at > now and len(buckets) <= self.max_tracked:
+                break
+            del buckets[key]
+        noticed = self._noticed
+        while noticed:
+            key, until = next(iter(noticed.items()))
+            if until > now and len(noticed) <= self.max_tracked:
+                break
+            del noticed[key]
+
+    def hit(self, command: str, user_id: int, chat_id: Optional[int], now: Optional[float] = None) -> float:
+        """Count one request; 0 if allowed, otherwise seconds until the next one is."""
+        limit = self.limits.get(command)
+        if limit is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        buckets = []
+        if limit.user_per_minute > 0:  # 0 — без лимита
+            buckets.append(self._bucket((command, "user", user_id), limit.user_per_minute))
+        if chat_id is not None and limit.chat_per_minute > 0:
+            buckets.append(self._bucket((command, "chat", chat_id), limit.chat_per_minute))
+
+        wait = max((bucket.delay(now) for bucket in buckets), default=0.0)
+        if not wait:
+            for bucket in buckets:
+                bucket.take(now)
+        self._evict(now)
+        return wait
+
+    def should_notify(self, command: str, user_id: int, wait: float, now: Optional[float] = None) -> bool:
+        """One notice per user and command until the throttling window is over."""
+        now = time.monotonic() if now is None else now
+        key = (command, user_id)
+        if self._noticed.get(key, 0.0) > now:
+            return False
+        self._noticed[key] = now + wait
+        self._noticed.move_to_end(key)
+        return True
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Drops expensive commands of users and chats that exceed their limits."""
+
+    def __init__(self, permissions: PermissionSet, scheduler: DeletionScheduler,
+                 throttler: Optional[Throttler] = None):
+        self.permissions = permissions
+        self.scheduler = scheduler
+        self.throttler = throttler if throttler is not None else Throttler()
+        self.throttled = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        command: Optional[CommandObject] = data.get("command")
+        if command is None or event.from_user is None or self.permissions.is_admin(event.from_user.id):
+            return await handler(event, data)
+
+        name = command.command.lower()
+        user_id = event.from_user.id
+        chat_id = None if event.chat.type == "private" else event.chat.id
+        wait = self.throttler.hit(name, user_id, chat_id)
+        if not wait:
+            return await handler(event, data)
+
+        self.throttled += 1
+        logger.debug(f"Throttled /{name} from user {user_id} in chat {event.chat.id} for {wait:.0f}s")
+        if self.throttler.should_notify(name, user_id, wait):
+            try:
+                notice = await event.reply(f"⏳ Слишком часто. /{name} можно будет снова через {int(wait) + 1} сек.")
+                self.scheduler.schedule(notice.chat.id, notice.message_id, NOTICE_TTL)
+            except Exception as e:
+                logger.debug(f"Failed to send throttling notice: {e}")
+        return None
+
+    def format(self) -> str:
+        return f"Отклонено по лимитам команд: {self.throttled} (отслеживается: {len(self.throttler)})"
@@ -1,5 +1,6 @@
 import os
 import logging
+import secrets
 from typing import Final, Optional
 
 # Telegram Bot Configuration
@@ -9,6 +10,13 @@ CREATOR_ID: Final = 1951437901
 CREATOR_USERNAME: Final = "@vladlotto"
 MANAGEMENT_CHAT_ID: Final = -1002473077041
 
+# Telegram webhook mode (по умолчанию long polling)
+TELEGRAM_USE_WEBHOOK: Final = os.getenv('TELEGRAM_USE_WEBHOOK', 'false').lower() == 'true'
+# Публичный адрес веб-сервера keep_alive; на Render задаётся автоматически
+TELEGRAM_WEBHOOK_URL: Final = os.getenv('TELEGRAM_WEBHOOK_URL', '') or os.getenv('RENDER_EXTERNAL_URL', '')
+# Проверяется в заголовке X-Telegram-Bot-Api-Secret-Token; без env — случайный на каждый запуск
+TELEGRAM_WEBHOOK_SECRET: Final = os.getenv('TELEGRAM_WEBHOOK_SECRET', '') or secrets.token_urlsafe(32)
+
 # Discord Bot Configuration  
 _discord_token = os.getenv('DISCORD_TOKEN', '')
 DISCORD_TOKEN: Final = _discord_token.strip() if _discord_token else ''
@@ -32,18 +40,37 @@ BANNED_WORDS_FILE: Final = "data/banned_words.json"
 INFO_FILE: Final = "data/info.json"
 RANK_FILE: Final = "data/rank.json"
 
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('bot.log', encoding='utf-8')
-    ]
-)
-
 logger = logging.getLogger(__name__)
 
+# Logging: queue + writer thread, bot.log rotated by size or age and gzipped
+LOG_FILE: Final = os.getenv('LOG_FILE', 'bot.log')
+LOG_LEVEL: Final = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_MAX_BYTES: Final = int(os.getenv('LOG_MAX_MB', '10')) * 1024 * 1024
+LOG_ROTATE_HOURS: Final = float(os.getenv('LOG_ROTATE_HOURS', '24'))
+LOG_BACKUP_COUNT: Final = int(os.getenv('LOG_BACKUP_COUNT', '7'))
+LOG_DEBUG_SAMPLE: Final = int(os.getenv('LOG_DEBUG_SAMPLE', '10'))  # из DEBUG одной строки пишется каждая N-я
+
+_queued_logging = None
+
+def setup_logging():
+    """Configure console + bot.log logging; called by entry points, not on import"""
+    global _queued_logging
+    if _queued_logging is not None:
+        return _queued_logging
+    import atexit
+    import log_queue
+
+    _queued_logging = log_queue.start(
+        LOG_FILE,
+        level=getattr(logging, LOG_LEVEL, logging.INFO),
+        max_bytes=LOG_MAX_BYTES,
+        interval=LOG_ROTATE_HOURS * 3600,
+        backup_count=LOG_BACKUP_COUNT,
+        debug_sample=LOG_DEBUG_SAMPLE,
+    )
+    atexit.register(_queued_logging.stop)  # дописать очередь в файл при выходе
+    return _queued_logging
+
 def validate_config() -> bool:
     """Validate that all required configuration is present"""
     required_vars = [
@@ -60,6 +87,9 @@ def validate_config() -> bool:
         if not var_value:
             missing_vars.append(var_name)
     
+    if TELEGRAM_USE_WEBHOOK and not TELEGRAM_WEBHOOK_URL:
+        missing_vars.append("TELEGRAM_WEBHOOK_URL")
+
     if missing_vars:
         logger.error(f"Отсутствуют обязательные переменные окружения: {', '.join(missing_vars)}")
         return False
@@ -114,6 +144,7 @@ HELP_MESSAGE_ADMIN: Final = HELP_MESSAGE_USER + """
 /addword - Добавить запрещенное слово
 /unword - Убрать запрещенное слово
 /words - Показать список запрещенных слов
+/statusboard - Закрепить обновляемый статус серверов (off — убрать)
 """
 
 HELP_MESSAGE_CREATOR: Final = HELP_MESSAGE_ADMIN + """
@@ -148,7 +179,7 @@ RANK_MESSAGE: Final = """
 
 WORDS_MESSAGE: Final = """
 <b> Список запрещенных слов:</b>
-{
+{}
 """
 
 SHOP_HELP_MESSAGE: Final = """
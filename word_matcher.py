@@ -0,0 +1,293 @@
+"""
+Compiled banned-word matching (Aho-Corasick automaton).
+One pass over the message regardless of how many words are banned.
+Words and messages both go through normalization.normalize first.
+"""
+
+import logging
+import re
+from collections import deque, OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from config import CHAT_CACHE_SIZE
+from data_manager import DataManager, DataChange, WORDS
+from normalization import NormalizedText, normalize, normalize_word
+from patterns import GLOB, REGEX, PatternError, combine, glob_to_regex, max_width, pattern_kind, regex_source
+
+logger = logging.getLogger(__name__)
+
+# Below this many words a C-level `word in text` scan beats the pure-Python
+# automaton (see benchmarks/bench_word_matcher.py), so small lists use it.
+LINEAR_SCAN_LIMIT = 200
+
+# Globs and regexes search long messages in overlapping windows: the guard in
+# patterns.py keeps them free of nested and adjacent repeats, but a single
+# repeat is still quadratic in the searched length (".*z" tries every start).
+# Windows overlap by the pattern's max_width (at least REGEX_OVERLAP), so a
+# match is never split between two windows.
+REGEX_WINDOW = 512
+REGEX_OVERLAP = 128
+
+
+def search_windowed(pattern: re.Pattern, text: str, window: int = REGEX_WINDOW,
+                    overlap: int = REGEX_OVERLAP) -> Optional[re.Match]:
+    """pattern.search(text) with the cost bounded per window instead of per message.
+
+    Exact when no match reads more than `overlap` characters past its start.
+    """
+    length = len(text)
+    start = 0
+    while True:
+        # pos сохраняет контекст слева (\b, lookbehind видят предыдущие символы),
+        # endpos обрезает строку: совпадение, упёршееся в обрезанный конец, не засчитываем
+        endpos = min(length, start + window)
+        pos = start
+        while True:
+            m = pattern.search(text, pos, endpos)
+            if m is None:
+                break
+            if endpos == length or m.end() < endpos:
+                return m
+            if m.start() >= endpos - overlap:
+                break  # целиком попадёт в следующее окно
+            pos = m.start() + 1
+        if endpos == length:
+            return None
+        start = endpos - overlap
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher built once from a word list."""
+
+    __slots__ = ("patterns", "linear_scan", "_goto", "_fail", "_out", "_hit")
+
+    def __init__(self, patterns: Iterable[str], linear_scan_limit: int = LINEAR_SCAN_LIMIT):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[int] = [-1]  # индекс паттерна, который заканчивается в этом состоянии
+
+        seen = set()
+        for pattern in patterns:
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._add(pattern)
+        self._build()
+        self.linear_scan = len(self.patterns) <= linear_scan_limit
+
+    def _add(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append(-1)
+            state = nxt
+        self._out[state] = len(self.patterns)
+        self.patterns.append(pattern)
+
+    def _build(self):
+        """Compute failure links and, per state, the nearest pattern reachable via them."""
+        goto, out = self._goto, self._out
+        fail = [0] * len(goto)
+        hit = list(out)  # own pattern or the closest one along the fail chain
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if hit[nxt] < 0:
+                    hit[nxt] = hit[fail[nxt]]
+
+        self._fail = fail
+        self._hit = hit
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def search(self, text: str) -> Optional[Tuple[int, str]]:
+        """A match as (start index, pattern), or None. Single pass over text."""
+        if not self.patterns:
+            return None
+        if self.linear_scan:
+            for pattern in self.patterns:
+                if pattern in text:
+                    return text.find(pattern), pattern
+            return None
+        goto, fail, hit = self._goto, self._fail, self._hit
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            idx = hit[state]
+            if idx >= 0:
+                pattern = self.patterns[idx]
+                return i - len(pattern) + 1, pattern
+        return None
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """All matches as (start index, pattern), overlapping ones included."""
+        matches: List[Tuple[int, str]] = []
+        if not self.patterns:
+            return matches
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            s = state
+            while s:
+                idx = out[s]
+                if idx >= 0:
+                    pattern = self.patterns[idx]
+                    matches.append((i - len(pattern) + 1, pattern))
+                s = fail[s]
+        return matches
+
+
+def _overlap(pattern: Optional[re.Pattern]) -> Tuple[int, int]:
+    """(window, overlap) for search_windowed that never splits a match of `pattern`."""
+    if pattern is None:
+        return REGEX_WINDOW, REGEX_OVERLAP
+    overlap = max(REGEX_OVERLAP, max_width(pattern.pattern))
+    return max(REGEX_WINDOW, 4 * overlap), overlap
+
+
+class WordMatch(NamedTuple):
+    word: str      # запрещённое слово, как оно сохранено
+    fragment: str  # фрагмент исходного сообщения, который с ним совпал
+    start: int     # смещения в исходном сообщении
+    end: int
+
+
+class CompiledWords:
+    """Everything banned in one scope, compiled once.
+
+    Plain words go into the automaton, globs into one alternation over the
+    normalized text, regexes into one case-insensitive alternation over the
+    original text. Patterns failing the complexity guard are skipped.
+    """
+
+    __slots__ = ("automaton", "originals", "globs", "glob_re", "glob_overlap",
+                 "regexes", "regex_re", "regex_overlap")
+
+    def __init__(self, words: Iterable[str]):
+        self.originals: Dict[str, str] = {}
+        globs: List[Tuple[str, str]] = []
+        regexes: List[Tuple[str, str]] = []
+        for word in words:
+            try:
+                kind = pattern_kind(word)
+                if kind == GLOB:
+                    globs.append((word, glob_to_regex(word)))
+                elif kind == REGEX:
+                    regexes.append((word, regex_source(word)))
+                else:
+                    self.originals.setdefault(normalize_word(word), word)
+            except PatternError as e:
+                logger.warning(f"Skipping banned-word pattern '{word}': {e}")
+
+        self.automaton = AhoCorasick(self.originals)
+        self.globs = [word for word, _ in globs]
+        self.glob_re = combine(globs)
+        self.regexes = [word for word, _ in regexes]
+        self.regex_re = combine(regexes, re.IGNORECASE)
+        self.glob_overlap = _overlap(self.glob_re)
+        self.regex_overlap = _overlap(self.regex_re)
+
+    def __len__(self) -> int:
+        return len(self.automaton) + len(self.globs) + len(self.regexes)
+
+    def search(self, text: str, normalized: Optional[NormalizedText] = None) -> Optional[WordMatch]:
+        if self.automaton or self.glob_re is not None:
+            if normalized is None:
+                normalized = normalize(text)
+            match = self.automaton.search(normalized.text)
+            if match is not None:
+                start, pattern = match
+                orig_start, orig_end = normalized.span(start, start + len(pattern))
+                return WordMatch(self.originals[pattern], text[orig_start:orig_end], orig_start, orig_end)
+            if self.glob_re is not None:
+                m = search_windowed(self.glob_re, normalized.text, *self.glob_overlap)
+                if m is not None:
+                    orig_start, orig_end = normalized.span(m.start(), m.end())
+                    word = self.globs[int(m.lastgroup[1:])]
+                    return WordMatch(word, text[orig_start:orig_end], orig_start, orig_end)
+
+        if self.regex_re is not None:
+            m = search_windowed(self.regex_re, text, *self.regex_overlap)
+            if m is not None:
+                word = self.regexes[int(m.lastgroup[1:])]
+                return WordMatch(word, m.group(), m.start(), m.end())
+        return None
+
+
+class BannedWordMatcher:
+    """The global list compiled once, plus each chat's own additions compiled separately.
+
+    Chats without words of their own (almost all of them) share the global
+    matcher, so memory and rebuilds don't grow with the number of chats.
+    """
+
+    def __init__(self, data_manager: DataManager, cache_size: int = CHAT_CACHE_SIZE):
+        self.data_manager = data_manager
+        self.cache_size = cache_size
+        self.builds = 0
+        self._global: Optional[CompiledWords] = None
+        # chat_id -> дополнения чата (None: своих слов нет), LRU
+        self._chats: "OrderedDict[int, Optional[CompiledWords]]" = OrderedDict()
+        data_manager.subscribe(self._on_change, WORDS)
+
+    def _on_change(self, event: DataChange):
+        if event.chat_id is None:
+            self._global = None  # дополнения чатов от глобального списка не зависят
+        else:
+            self._chats.pop(event.chat_id, None)
+
+    def _compile(self, words: List[str], chat_id: Optional[int]) -> CompiledWords:
+        matcher = CompiledWords(words)
+        self.builds += 1
+        logger.debug(f"Compiled banned-word matcher for chat {chat_id}: {len(matcher)} words")
+        return matcher
+
+    def _chat_additions(self, chat_id: int) -> Optional[CompiledWords]:
+        if chat_id in self._chats:
+            self._chats.move_to_end(chat_id)
+            return self._chats[chat_id]
+        words = self.data_manager.get_chat_banned_words(chat_id)
+        matcher = self._compile(words, chat_id) if words else None
+        self._chats[chat_id] = matcher
+        if len(self._chats) > self.cache_size:
+            self._chats.popitem(last=False)
+        return matcher
+
+    def for_chat(self, chat_id: Optional[int] = None) -> Tuple[CompiledWords, ...]:
+        """Matchers to search for a chat: the global one, then the chat's additions if any."""
+        if self._global is None:
+            self._global = self._compile(self.data_manager.get_banned_words(), None)
+        additions = self._chat_additions(chat_id) if chat_id is not None else None
+        return (self._global,) if additions is None else (self._global, additions)
+
+    def search(self, text: str, chat_id: Optional[int] = None) -> Optional[WordMatch]:
+        """First banned word in the raw message text, or None."""
+        matchers = self.for_chat(chat_id)
+        if len(matchers) == 1:
+            return matchers[0].search(text)
+        normalized = normalize(text)  # одна нормализация на оба словаря
+        for matcher in matchers:
+            match = matcher.search(text, normalized)
+            if match is not None:
+                return match
+        return None